@@ -287,6 +287,8 @@ class Aliens4Friends:
 				  - A4F_SCANCODE    : wrapper/native, whether we use a natively installed scancode or
 				                      run it from our docker wrapper (default = native)
 				  - A4F_PRINTRESULT : Print results also to stdout
+				  - A4F_UPLOAD_WORKERS : Number of packages uploaded to Fossology in parallel
+				                      (default = 1, no parallel uploads)
 				  - SPDX_TOOLS_CMD  : command to invoke java spdx tools (default =
 				                      'java -jar /usr/local/lib/spdx-tools-2.2.5-jar-with-dependencies.jar')
 				  - SPDX_DISCLAIMER : legal disclaimer to add into generated SPDX files (optional)
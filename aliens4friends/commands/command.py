@@ -7,11 +7,12 @@ from enum import IntEnum
 from aliens4friends.commons.utils import log_minimal_error
 import logging
 from aliens4friends.commons.settings import Settings
-from typing import Any, List, Union
+from typing import Any, List, Optional, Union
 from aliens4friends.commons.pool import FILETYPE, Pool
 from aliens4friends.commons.session import Session
 from aliens4friends.commons.utils import get_func_arg_names
 from multiprocessing import Pool as MultiProcessingPool
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ class Processing(IntEnum):
 	MULTI = 0
 	LOOP = 1
 	SINGLE = 2
+	THREADS = 3
 
 class Command:
 
@@ -31,13 +33,17 @@ class Command:
 		self,
 		session_id: str,
 		processing: Processing,
-		dryrun: bool = False
+		dryrun: bool = False,
+		workers: Optional[int] = None
 	) -> None:
 		super().__init__()
 		self.pool = Pool(Settings.POOLPATH)
 		self.session = None
 		self.processing = processing
 		self.dryrun = dryrun
+		# max number of parallel run() calls with Processing.THREADS
+		# (None = ThreadPoolExecutor's default)
+		self.workers = workers
 
 		# Load a session if possible, or terminate otherwise
 		# Error messages are already inside load(), let the
@@ -122,11 +128,17 @@ class Command:
 
 		results = []
 		if self.processing == Processing.MULTI:
-			mpool = MultiProcessingPool()
-			results = mpool.map(
-				self._run,
-				run_args
-			)
+			with MultiProcessingPool() as mpool:
+				results = mpool.map(
+					self._run,
+					run_args
+				)
+		elif self.processing == Processing.THREADS:
+			# run() must be thread-safe: useful when run() mostly waits for
+			# subprocesses or network I/O, and when it needs to share state
+			# (ex. the session) that can't be shared between processes
+			with ThreadPoolExecutor(max_workers=self.workers) as executor:
+				results = list(executor.map(self._run, run_args))
 		elif self.processing == Processing.SINGLE:
 			results.append(self._run(args))
 		elif self.processing == Processing.LOOP:
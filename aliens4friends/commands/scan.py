@@ -1,7 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
 
-import json
 import logging
 import os
 from typing import List, Optional
@@ -13,6 +12,7 @@ from aliens4friends.commons.scancode import Scancode
 from aliens4friends.commons.settings import Settings
 from aliens4friends.models.alienmatcher import (AlienMatcherModel,
                                                 AlienSnapMatcherModel)
+from aliens4friends.models.base import json_load
 
 logger = logging.getLogger(__name__)
 
@@ -86,8 +86,7 @@ class Scan(Command):
 				os.path.join("files", model.aliensrc.internal_archive_name)
 			)
 			if result_file and Settings.PRINTRESULT:
-				with open(result_file) as r:
-					result.append(json.load(r))
+				result.append(json_load(result_file))
 		except TypeError as ex:
 			if not model.aliensrc.internal_archive_name:
 				logger.info(f"[{package}] no internal archive to scan here")
@@ -87,7 +87,10 @@ class SpdxAlien(Command):
 		fix_spdxtv(scancode_spdx_filename)
 		scancode_spdx, _ = parse_spdx_tv(scancode_spdx_filename)
 		alien_package = AlienPackage(alien_package_filename)
-		alien_package.expand(get_internal_archive_checksums=True)
+		alien_package.expand(
+			get_internal_archive_checksums=True,
+			cache_dir=self.pool.mkdir(Settings.PATH_TMP, "expand")
+		)
 
 		deltacodeng_results_filename = ""
 		debian_spdx_filename = ""
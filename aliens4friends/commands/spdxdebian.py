@@ -79,6 +79,7 @@ class SpdxDebian(Command):
 			if match.debsrc_debian
 			else None # native format, only 1 archive
 		)
+		tmpdir_obj = None
 		if debsrc_debian and '.diff.' in debsrc_debian:
 			logger.debug(
 				f"[{package}] Debian source format 1.0 (non-native) processing patch"
@@ -133,3 +134,7 @@ class SpdxDebian(Command):
 		except Debian2SPDXException as ex:
 			logger.warning(f"[{package}] {ex}")
 			return True
+		finally:
+			# remove the patched debian sources now, not when garbage collected
+			if tmpdir_obj:
+				tmpdir_obj.cleanup()
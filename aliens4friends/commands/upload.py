@@ -3,6 +3,7 @@
 
 import os
 import logging
+import threading
 from typing import Union
 
 from aliens4friends.commons.fossyupload import UploadAliens2Fossy
@@ -19,11 +20,35 @@ logger = logging.getLogger(__name__)
 class Upload(Command):
 
 	def __init__(self, session_id: str, dryrun: bool):
-		# Each run updates the session model! I would not be possible if we used
-		# multi-processing, but we never use multiprocessing when dealing with
-		# Fossology API
-		super().__init__(session_id, Processing.LOOP, dryrun)
-		self.fossywrapper = FossyWrapper()
+		# Each run updates the session model! It would not be possible if we used
+		# multi-processing, so we use threads (which share the session) when
+		# dealing with Fossology API: most of the time is spent waiting for
+		# tar/xz, for uploads and for Fossology itself.
+		# Packages are uploaded one after the other, unless A4F_UPLOAD_WORKERS
+		# is set to more than 1.
+		workers = Settings.UPLOAD_WORKERS
+		super().__init__(
+			session_id,
+			Processing.THREADS if workers > 1 else Processing.LOOP,
+			dryrun,
+			workers
+		)
+		self.session_lock = threading.Lock()
+		# FossyWrapper keeps a logged-in WebUI session and a REST API token,
+		# so each worker thread gets its own instance, created on first use.
+		# The one of this thread is created right away, so that wrong
+		# credentials or an unreachable server abort the command before
+		# doing any work (it is also the one used when not using threads)
+		self._local = threading.local()
+		self._local.fossywrapper = FossyWrapper()
+
+	@property
+	def fossywrapper(self) -> FossyWrapper:
+		try:
+			return self._local.fossywrapper
+		except AttributeError:
+			self._local.fossywrapper = FossyWrapper()
+			return self._local.fossywrapper
 
 	def hint(self) -> str:
 		return "add/spdxalien"
@@ -68,25 +93,30 @@ class Upload(Command):
 				msg = "Package does not contain any files (is it a meta-package?)"
 				logger.info(f"[{cur_pckg}] {msg}, skipping")
 				# De-select package in session if it's a metapackage
-				# This is OK, because we are in a loop and not multiprocessing environment
+				# This is OK, because we are in a loop or in threads, and not
+				# in a multiprocessing environment
 				# FIXME Shouldn't this be done earlier?
-				self.session.set_package(
-					{
-						"selected": False,
-						"selected_reason": msg
-					},
-					apkg.name,
-					apkg.version.str,
-					apkg.variant
-				)
-				self.session.write_package_list()
+				with self.session_lock:
+					self.session.set_package(
+						{
+							"selected": False,
+							"selected_reason": msg
+						},
+						apkg.name,
+						apkg.version.str,
+						apkg.variant
+					)
+					self.session.write_package_list()
 				return True
 
 			logger.info(
 				f"[{cur_pckg}] expanding alien package,"
 				" it may require a lot of time"
 			)
-			apkg.expand(get_internal_archive_rootfolders=True)
+			apkg.expand(
+				get_internal_archive_rootfolders=True,
+				cache_dir=self.pool.mkdir(Settings.PATH_TMP, "expand")
+			)
 		except Exception:
 			raise CommandError(f"[{cur_pckg}] Unable to load aliensrc from {path} ")
 
@@ -114,8 +144,7 @@ class Upload(Command):
 		# already check if such tasks have already been run and in the positive
 		# case they do not run them again, so we don't need to bother about it
 		# here
-		a2f.run_fossy_scanners()
-		a2f.import_spdx()
+		a2f.run_fossy_scanners_and_import_spdx()
 
 		alien_fossy_json_path = self.pool.relpath_typed(
 			FILETYPE.FOSSY,
@@ -137,18 +166,19 @@ class Upload(Command):
 			fossy_data, get_prefix_formatted(), alien_fossy_json_path
 		)
 
-		# This is OK, because we are in a loop and not in a multiprocessing
-		# environment (we never use multiprocessing when dealing with fossology
-		# API)
-		self.session.set_package(
-			{
-				"uploaded": a2f.uploaded,
-				"uploaded_reason": a2f.uploaded_reason
-			},
-			apkg.name,
-			apkg.version.str,
-			apkg.variant
-		)
-		self.session.write_package_list()
+		# This is OK, because we are in a loop or in threads, and not in a
+		# multiprocessing environment (we never use multiprocessing when dealing
+		# with fossology API)
+		with self.session_lock:
+			self.session.set_package(
+				{
+					"uploaded": a2f.uploaded,
+					"uploaded_reason": a2f.uploaded_reason
+				},
+				apkg.name,
+				apkg.version.str,
+				apkg.variant
+			)
+			self.session.write_package_list()
 
 		return upload_id
@@ -4,13 +4,17 @@
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple, Union
+from typing import FrozenSet, Optional, Set, Tuple, Union
 
 import requests
 from debian.deb822 import Deb822
 
 from aliens4friends.commons.archive import Archive, ArchiveError
+from aliens4friends.commons.aliases import ALIASES
 from aliens4friends.commons.calc import Calc
 from aliens4friends.commons.package import (AlienPackage, DebianPackage,
                                             Package, PackageError)
@@ -24,6 +28,26 @@ from aliens4friends.models.alienmatcher import (AlienMatcherModel, AlienSrc,
 
 logger = logging.getLogger(__name__)
 
+# Names shorter than this (after cleaning) are never filtered out by bigrams,
+# since Calc.fuzzy_package_score may still match them by removing prefixes
+BIGRAM_MIN_LEN = 5
+
+def _name_bigrams(name: str) -> Optional[FrozenSet[str]]:
+	"""
+	Character bigrams of a cleaned package name, or None if the name is too
+	short to be used for prefiltering. Calc.fuzzy_package_score returns 0 for
+	all package names that have no bigram in common with the searched name.
+	"""
+	name = Calc._clean_name(name)
+	if len(name) < BIGRAM_MIN_LEN:
+		return None
+	return frozenset(name[i:i+2] for i in range(len(name) - 1))
+
+# HTTP sessions to Debian servers, one for each thread (requests.Session is not
+# thread-safe); kept outside AlienMatcher, which gets pickled when
+# multiprocessing
+_http_local = threading.local()
+
 
 class AlienMatcherError(Exception):
 	pass
@@ -49,11 +73,31 @@ class AlienMatcher:
 	]
 	API_URL_ALLSRC = "https://api.ftp-master.debian.org/all_sources"
 
+	# How many candidate shortlists to keep for later searches
+	PREFIX_CACHE_SIZE = 64
+
+	# Parallel downloads of Debian source files of a single package
+	DOWNLOAD_WORKERS = 4
+
 	def __init__(self, pool: Pool) -> None:
 		self.pool = pool
+		self._prefix_cache: 'OrderedDict[str, Tuple[FrozenSet[str], Set[int]]]' = OrderedDict()
 		self.set_deb_all_sources()
 		logging.getLogger("urllib3").setLevel(logging.WARNING)
 
+	@property
+	def http(self) -> requests.Session:
+		"""
+		HTTP session to reuse connections to Debian servers. We create one for
+		each thread, and for each process, since matchers get forked when
+		multiprocessing.
+		"""
+		pid = os.getpid()
+		if getattr(_http_local, "pid", None) != pid:
+			_http_local.session = requests.Session()
+			_http_local.pid = pid
+		return _http_local.session
+
 	def set_deb_all_sources(self) -> None:
 		if 'DEB_ALL_SOURCES' in globals():
 			return
@@ -69,7 +113,7 @@ class AlienMatcher:
 			logger.debug(f"API call result found in cache at {api_response_cached}.")
 		except FileNotFoundError:
 			logger.debug(f"API call result not found in cache. Making an API call...")
-			response = requests.get(AlienMatcher.API_URL_ALLSRC)
+			response = self.http.get(AlienMatcher.API_URL_ALLSRC)
 			if response.status_code != 200:
 				raise AlienMatcherError(
 					f"Cannot get API response, got error {response.status_code}"
@@ -80,6 +124,49 @@ class AlienMatcher:
 		global DEB_ALL_SOURCES
 		DEB_ALL_SOURCES = json.loads(response)
 
+		# Inverted index from name bigrams to positions inside DEB_ALL_SOURCES,
+		# and positions of names that are too short to be filtered
+		global DEB_BIGRAM_INDEX
+		global DEB_UNFILTERED
+		DEB_BIGRAM_INDEX = {}
+		DEB_UNFILTERED = set()
+		for i, pkg in enumerate(DEB_ALL_SOURCES):
+			bigrams = _name_bigrams(pkg["source"])
+			if bigrams is None:
+				DEB_UNFILTERED.add(i)
+				continue
+			for bigram in bigrams:
+				DEB_BIGRAM_INDEX.setdefault(bigram, set()).add(i)
+
+	def _candidates(self, name: str, needle: FrozenSet[str]) -> Set[int]:
+		"""
+		Positions inside DEB_ALL_SOURCES of all Debian packages that share at
+		least one bigram with the needle. Consecutive searches often have a
+		common name prefix, so we start from the shortlist of the longest
+		cached prefix, and add only the postings of bigrams it did not have.
+		"""
+		base_bigrams: FrozenSet[str] = frozenset()
+		result = DEB_UNFILTERED
+		for i in range(len(name), 1, -1):
+			cached = self._prefix_cache.get(name[:i])
+			if cached and cached[0] <= needle:
+				base_bigrams, result = cached
+				self._prefix_cache.move_to_end(name[:i])
+				break
+
+		missing = needle - base_bigrams
+		if not missing:
+			return result
+
+		result = set(result)
+		for bigram in missing:
+			result.update(DEB_BIGRAM_INDEX.get(bigram, ()))
+
+		self._prefix_cache[name] = (needle, result)
+		if len(self._prefix_cache) > self.PREFIX_CACHE_SIZE:
+			self._prefix_cache.popitem(last=False)
+		return result
+
 	def search(self, package: Package) -> Tuple[Package, int, float]:
 		logger.debug(f"[{self.curpkg}] Search for similar packages with {self.API_URL_ALLSRC}.")
 		if not isinstance(package, Package):
@@ -91,9 +178,24 @@ class AlienMatcher:
 			)
 		logger.debug(f"[{self.curpkg}] Package version {package.version.str} has a valid Debian versioning format.")
 
+		# Cheap prefilter: skip all Debian packages, which do not share any
+		# bigram with our package name (or its alias)
+		needle = _name_bigrams(package.name)
+		if needle is not None and package.name in ALIASES:
+			alias_bigrams = _name_bigrams(ALIASES[package.name])
+			needle = needle | alias_bigrams if alias_bigrams is not None else None
+
+		if needle is None:
+			debian_sources = DEB_ALL_SOURCES
+		else:
+			debian_sources = [
+				DEB_ALL_SOURCES[i]
+				for i in sorted(self._candidates(package.name, needle))
+			]
+
 		candidates = []
 		multi_names = False
-		for pkg in DEB_ALL_SOURCES:
+		for pkg in debian_sources:
 
 			similarity = Calc.fuzzy_package_score(package.name, pkg["source"])
 
@@ -127,7 +229,7 @@ class AlienMatcher:
 			if c[1] == cur_package_name:
 				if c[2] in seen:
 					continue
-				version = Version(c[2])
+				version = Version.parsed(c[2])
 				ver_distance = version.distance(package.version)
 				self.candidate_list.append([version, ver_distance, False])
 				seen.add(c[2])
@@ -199,7 +301,7 @@ class AlienMatcher:
 					f"[{self.curpkg}] Trying to download deb sources from"
 					f" {full_url}."
 				)
-				r = requests.get(full_url)
+				r = self.http.get(full_url)
 				if r.status_code == 200:
 					break
 			if r.status_code != 200:
@@ -235,8 +337,15 @@ class AlienMatcher:
 			if len(elem) != 3:
 				continue
 			debian_control_files.append(elem)
-			self.download_to_debian(package.name, package.version.str, elem[2])
 
+		# Downloads are bound by network latency, so fetch all files at once
+		with ThreadPoolExecutor(max_workers=self.DOWNLOAD_WORKERS) as executor:
+			list(executor.map(
+				lambda elem: self.download_to_debian(package.name, package.version.str, elem[2]),
+				debian_control_files
+			))
+
+		for elem in debian_control_files:
 			debian_relpath = self.pool.relpath(
 				Settings.PATH_DEB,
 				package.name,
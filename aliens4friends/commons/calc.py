@@ -2,10 +2,23 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-import numpy
+import threading
+from array import array
+from functools import lru_cache
+from typing import Tuple
 
 from .aliases import ALIASES
 
+# Per-thread DP rows for Calc.levenshtein, reused across calls
+_scratch = threading.local()
+
+def _scratch_rows(size: int) -> Tuple[array, array]:
+	rows = getattr(_scratch, "rows", None)
+	if rows is None or len(rows[0]) < size:
+		rows = (array('i', [0] * size), array('i', [0] * size))
+		_scratch.rows = rows
+	return rows
+
 class Calc:
 
 	# share of package valuation
@@ -34,44 +47,38 @@ class Calc:
 	}
 
 	@staticmethod
-	def levenshtein(first, second):
+	def levenshtein(first: str, second: str) -> int:
+		"""
+		Edit distance between two strings
+		"""
 
 		if first == second:
 			return 0
 
-		dist = numpy.zeros((len(first) + 1, len(second) + 1))
-
-		for f in range(len(first) + 1):
-			dist[f][0] = f
+		# Keep the shorter string in the inner loop, so rows are as short as possible
+		if len(first) < len(second):
+			first, second = second, first
 
+		# We only need the previous row to calculate the current one
+		prev, curr = _scratch_rows(len(second) + 1)
 		for s in range(len(second) + 1):
-			dist[0][s] = s
-
-		insert = 0
-		delete = 0
-		replace = 0
-
-		for f in range(1, len(first)+1):
-			for s in range(1, len(second)+1):
-				if (first[f-1] == second[s-1]):
-					dist[f][s] = dist[f-1][s-1]
+			prev[s] = s
+
+		for f in range(1, len(first) + 1):
+			curr[0] = f
+			first_char = first[f-1]
+			for s in range(1, len(second) + 1):
+				if first_char == second[s-1]:
+					d = prev[s-1]
 				else:
-					insert = dist[f][s-1]
-					delete = dist[f-1][s]
-					replace = dist[f-1][s-1]
-
-					if (insert <= delete and insert <= replace):
-						dist[f][s] = insert+1
-					elif (delete <= insert and delete <= replace):
-						dist[f][s] = delete+1
-					else:
-						dist[f][s] = replace+1
+					d = min(curr[s-1], prev[s], prev[s-1]) + 1
+				curr[s] = d
+			prev, curr = curr, prev
 
-		res = dist[len(first)][len(second)]
-
-		return res
+		return prev[len(second)]
 
 	@staticmethod
+	@lru_cache(maxsize=65536)
 	def _clean_name(name: str) -> str:
 		return name.rstrip("0123456789.~+").replace("-v", "").replace("-", "")
 
@@ -95,18 +102,19 @@ class Calc:
 		return Calc.SCORES["s" + str(score)]
 
 	@staticmethod
+	@lru_cache(maxsize=65536)
 	def fuzzy_package_score(given: str, new: str) -> int:
 
 		if given == new:
 			return 100
 
 		# Rename known packages to their Debian counterpart
-		if given in ALIASES:
-			given = ALIASES[given]
-
 		# We are sure that hardcoded aliases match perfectly
-		if given == new:
-			return 100
+		alias = ALIASES.get(given)
+		if alias:
+			if alias == new:
+				return 100
+			given = alias
 
 		# (glib-2.0 => glib2.0)
 		if given.replace("-", "") == new:
@@ -145,7 +153,11 @@ class Calc:
 				return 70
 
 		# Fonts may start with "fonts-" in Debian
-		if g.replace("fonts", "") == n.replace("fonts", ""):
+		# (without any "fonts" substring, n == g has already been checked above)
+		if (
+			("fonts" in g or "fonts" in n)
+			and g.replace("fonts", "") == n.replace("fonts", "")
+		):
 			return 70
 
 		# Library/API version at the end of the package name
@@ -1,11 +1,14 @@
 # SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
 # SPDX-License-Identifier: Apache-2.0
 
-import sys, os, logging, time, urllib.request, zipfile, json, re
+import sys, os, logging, time, urllib.request, zipfile, re
 
 from datetime import datetime
 
+import orjson
+
 from .version import Version
+from aliens4friends.models.base import json_load
 
 logging.basicConfig(format='%(name)s:slug=%(message)s', level=logging.INFO)
 logger = logging.getLogger("cvecheck")
@@ -158,8 +161,8 @@ class CveChecker:
 
 					logger.debug(f"{self.slug}     search for version: {self.version}")
 
-					needle = Version(self.version)
-					version = Version(affected_version)
+					needle = Version.parsed(self.version)
+					version = Version.parsed(affected_version)
 					direct_similarity = needle.similarity(version)
 
 					logger.info(f"{self.slug}     version similarity {direct_similarity}")
@@ -169,25 +172,25 @@ class CveChecker:
 
 					if "versionStartIncluding" in m:
 						start = m['versionStartIncluding']
-						vstart = Version(start)
+						vstart = Version.parsed(start)
 						inside_boundaries = needle > vstart or needle == vstart
 						rangebound = True
 						logger.info(f"{self.slug}     affected from including {start}")
 					if "versionStartExcluding" in m:
 						start = m['versionStartExcluding']
-						vstart = Version(start)
+						vstart = Version.parsed(start)
 						inside_boundaries = needle > vstart
 						rangebound = True
 						logger.info(f"{self.slug}     affected from excluding {start}")
 					if "versionEndIncluding" in m:
 						end = m['versionEndIncluding']
-						vend = Version(end)
+						vend = Version.parsed(end)
 						inside_boundaries = needle < vend or needle == vend
 						rangebound = True
 						logger.info(f"{self.slug}     affected until including {end}")
 					if "versionEndExcluding" in m:
 						end = m['versionEndExcluding']
-						vend = Version(end)
+						vend = Version.parsed(end)
 						inside_boundaries = needle < vend
 						rangebound = True
 						logger.info(f"{self.slug}     affected until excluding {end}")
@@ -269,9 +272,7 @@ class CveChecker:
 
 	def loadHarvestList(self, file) -> dict:
 		if os.path.isfile(file):
-			feed = open(file, encoding='utf-8')
-			data = json.load(feed)
-			return data
+			return json_load(file)
 		else:
 			return {}
 
@@ -284,15 +285,14 @@ class CveChecker:
 			json_feed = self.tmpdir+"/"+self.FILEIDENT+str(start)+".json";
 			logger.info(f'{self.slug} scanning feed: {json_feed}')
 			if os.path.isfile(json_feed):
-				feed = open(json_feed, encoding='utf-8')
-				data = json.load(feed)
+				data = json_load(json_feed)
 				for i in data["CVE_Items"]:
 					if not self.validCveFormat(i):
 						logger.error(f'{self.slug} Wrong CVE datatype: MITRE/CVE/4.0 support only')
 						continue
 
 					cveid = i["cve"]["CVE_data_meta"]["ID"]
-					config_string = json.dumps(i["configurations"])
+					config_string = orjson.dumps(i["configurations"]).decode()
 
 					if re.search(self.slug, config_string):
 						if self.slug not in self.candidates:
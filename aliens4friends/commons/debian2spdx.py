@@ -34,6 +34,7 @@ from spdx.version import Version as SPDXVersion
 from spdx.writers.tagvalue import write_document
 
 from aliens4friends.commons.archive import Archive
+from aliens4friends.commons.spdxutils import calc_verif_code, get_files_sha1
 from aliens4friends.commons.utils import md5
 
 logger = logging.getLogger(__name__)
@@ -388,7 +389,7 @@ class Debian2SPDX:
 			spdx_file.name = f"./{spdx_file.name}"
 			spdx_file.copyright = spdx_file.copyright or SPDXNone()
 			spdx_pkg.add_file(spdx_file)
-		spdx_pkg.verif_code = spdx_pkg.calc_verif_code()
+		spdx_pkg.verif_code = calc_verif_code(get_files_sha1(spdx_pkg.files))
 		self.spdx_pkg = spdx_pkg
 
 	def create_spdx_document(self) -> None:
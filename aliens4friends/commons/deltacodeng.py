@@ -1,7 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileCopyrightText: Alberto Pianon <pianon@array.eu>
 
-import json
 import re
 import logging
 from datetime import datetime
@@ -13,6 +12,7 @@ from deepdiff import DeepDiff
 from aliens4friends.commons.pool import Pool
 from aliens4friends.commons.settings import Settings
 
+from aliens4friends.models.base import json_dumps, json_load
 from aliens4friends.models.deltacode import Tool, Compared, Header, DeltaCodeModel, MovedFile
 
 logger = logging.getLogger(__name__)
@@ -27,9 +27,10 @@ RELEVANT_FINDINGS = [
 
 EMPTY_FILE_SHA1 = "da39a3ee5e6b4b0d3255bfef95601890afd80709"
 
+_RE_NON_ALPHANUMERICAL = re.compile(r'[^\d\w]')
+
 def get_word_list(string: str) -> List[str]:
-	p = re.compile('[^\d\w]')
-	only_alphanumerical_chars_str = p.sub(' ', string)
+	only_alphanumerical_chars_str = _RE_NON_ALPHANUMERICAL.sub(' ', string)
 	return only_alphanumerical_chars_str.split()
 
 def is_year(year: str) -> bool:
@@ -151,8 +152,7 @@ class DeltaCodeNG:
 
 	def _import(self, scan_out_file: str) -> dict:
 		try:
-			with open(scan_out_file) as f:
-				scan_out = json.load(f)
+			scan_out = json_load(scan_out_file)
 		except FileNotFoundError:
 			raise DeltaCodeNGException(
 				f"File {self.pool.clnpath(scan_out_file)} not found. "
@@ -242,5 +242,5 @@ class DeltaCodeNG:
 			yield (f'{k}: {len(v)}')
 
 	def write_results(self) -> None:
-		with open(self.result_file, "w") as f:
-			f.write(self.res.to_json(indent=2))
+		with open(self.result_file, "wb") as f:
+			f.write(json_dumps(self.res, indent=True))
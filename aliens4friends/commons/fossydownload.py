@@ -13,7 +13,8 @@ from spdx.package import Package as SPDXPackage
 from aliens4friends.commons.fossywrapper import FossyWrapper
 from aliens4friends.commons.package import AlienPackage
 from aliens4friends.commons.settings import Settings
-from aliens4friends.commons.spdxutils import parse_spdx_tv
+from aliens4friends.commons.spdxutils import (calc_verif_code, get_files_sha1,
+                                              parse_spdx_tv)
 from aliens4friends.commons.utils import bash
 
 logger = logging.getLogger(__name__)
@@ -128,7 +129,9 @@ class GetFossyData:
 			self.doc.package.files[i].name = self.doc.package.files[i].name.replace(
 				f"{self.upload.uploadname}/", f"./"
 			)
-		self.doc.package.verif_code = self.doc.package.calc_verif_code()
+		self.doc.package.verif_code = calc_verif_code(
+			get_files_sha1(self.doc.package.files)
+		)
 		logger.info(f"[{self.upload.uploadname}] Saving spdx report")
 		self._fix_fossy_spdx(self.doc)
 		return self.doc
@@ -180,8 +183,9 @@ class GetFossyData:
 	def get_metadata_from_fossology(self):
 		"""get summary and license findings and conclusions from fossology"""
 		logger.info(f"[{self.upload.uploadname}] Getting metadata from fossology")
-		summary = self.fossy.get_summary(self.upload)
-		licenses = self.fossy.get_license_findings_conclusions(self.upload)
+		summary, licenses = self.fossy.get_summary_and_license_findings_conclusions(
+			self.upload
+		)
 		return {
 			"origin": Settings.FOSSY_SERVER,
 			"summary": summary,
@@ -2,10 +2,17 @@
 # SPDX-FileCopyrightText: Alberto Pianon <pianon@array.eu>
 
 import os
+import re
+import mmap
+import tarfile
 import tempfile
+import socket
 import logging
+import ipaddress
+from functools import lru_cache
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from aliens4friends.commons.pool import Pool
-from aliens4friends.commons.utils import bash
 from aliens4friends.commons.settings import Settings
 from aliens4friends.commons.package import AlienPackage
 from aliens4friends.commons.fossywrapper import FossyWrapper
@@ -14,10 +21,36 @@ from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+RE_RDF_FILENAME = re.compile(rb"fileName>\./")
+
 class UploadAliens2FossyException(Exception):
 	pass
 
 
+def _fossy_is_local() -> bool:
+	"""True if Fossology server runs on this host or on a private network
+	(ex. a docker-compose service, like http://fossology)"""
+	return _host_is_local(urlparse(Settings.FOSSY_SERVER).hostname)
+
+
+# the answer does not change during a run: resolve the Fossology hostname only
+# once, and not for each uploaded package
+@lru_cache(maxsize=None)
+def _host_is_local(hostname: Optional[str]) -> bool:
+	if not hostname:
+		return False
+	try:
+		addrinfo = socket.getaddrinfo(hostname, None)
+	except (socket.gaierror, UnicodeError):
+		return False
+	for _, _, _, _, sockaddr in addrinfo:
+		# strip the scope id from IPv6 link-local addresses
+		ip = ipaddress.ip_address(sockaddr[0].split("%")[0])
+		if not (ip.is_loopback or ip.is_private):
+			return False
+	return bool(addrinfo)
+
+
 class UploadAliens2Fossy:
 
 	# Type hints for attributes not declared in __init__:
@@ -67,21 +100,15 @@ class UploadAliens2Fossy:
 			logger.info(f"[{self.uploadname}] {self.uploaded_reason}")
 			return upload.id
 		logger.info(f"[{self.uploadname}] Preparing package for upload")
-		tmpdir_obj = tempfile.TemporaryDirectory()
-		tmpdir = tmpdir_obj.name
-		self.alien_package.archive.extract_raw(tmpdir)
-		files_dir = os.path.join(tmpdir, "files")
-		# use tar.xz because it's more fossology-friendly (no annoying
-		# subfolders in unpacking)
-		tar2upload = os.path.join(tmpdir, f"{self.uploadname}.tar.xz")
-		bash(f"tar cJf {tar2upload} .", cwd=files_dir)
-		logger.info(f"[{self.uploadname}] Uploading package")
-		folder = self.fossy.get_or_create_folder(self.fossy_folder)
-		self.upload = self.fossy.upload(
-			tar2upload,
-			folder,
-			self.description
-		)
+		with tempfile.TemporaryDirectory() as tmpdir:
+			tar2upload = self._make_upload_archive(tmpdir)
+			logger.info(f"[{self.uploadname}] Uploading package")
+			folder = self.fossy.get_or_create_folder(self.fossy_folder)
+			self.upload = self.fossy.upload(
+				tar2upload,
+				folder,
+				self.description
+			)
 		self.fossy.rename_upload(
 			self.upload,
 			self.uploadname
@@ -93,60 +120,117 @@ class UploadAliens2Fossy:
 		return self.upload.id
 
 
+	def _make_upload_archive(self, dest_dir: str) -> str:
+		"""Create the archive to upload to Fossology in dest_dir, out of the
+		files/ folder of the alien package, and return its path.
+
+		Entries are copied straight from the aliensrc archive to the new one,
+		without extracting them to disk first."""
+		# use tar.xz because it's more fossology-friendly (no annoying
+		# subfolders in unpacking); it is just a transport archive, so the
+		# fastest xz preset is good enough. If Fossology is local, network
+		# bandwidth is cheap and compression would only waste cpu time
+		if _fossy_is_local():
+			tar2upload = os.path.join(dest_dir, f"{self.uploadname}.tar")
+			dst_args = { "mode": "w" }
+		else:
+			tar2upload = os.path.join(dest_dir, f"{self.uploadname}.tar.xz")
+			dst_args = { "mode": "w:xz", "preset": 1 }
+		with tarfile.open(self.alien_package.archive.path, mode="r:*") as src, \
+			tarfile.open(tar2upload, **dst_args) as dst:
+			for member in src:
+				name = self._strip_files_folder(member.name)
+				if name is None:
+					continue
+				member.name = name
+				# PAX headers take precedence over name fields, when writing
+				# (they are used for long and non-ascii names)
+				member.pax_headers.pop("path", None)
+				if member.islnk():
+					# hard links point to other archive members
+					member.linkname = self._strip_files_folder(member.linkname) or member.linkname
+					member.pax_headers.pop("linkpath", None)
+				dst.addfile(member, src.extractfile(member) if member.isfile() else None)
+		return tar2upload
+
+	@staticmethod
+	def _strip_files_folder(name: str) -> Optional[str]:
+		"""Map an aliensrc member name below files/ to its name in the upload
+		archive, or return None if it is not below files/"""
+		if name.startswith("./"):
+			name = name[2:]
+		if name == "files" or name == "files/":
+			return "."
+		if name.startswith("files/"):
+			return f"./{name[6:]}"
+		return None
+
 	def run_fossy_scanners(self) -> None:
 			logger.info(f"[{self.uploadname}] Run fossy scanners")
 			self.fossy.schedule_fossy_scanners(self.upload)
 
-	def _convert_and_upload_spdx(self, alien_spdx_fullpath: str) -> None:
-		tmpdir_obj = tempfile.TemporaryDirectory()
-		tmpdir = tmpdir_obj.name
+	def _convert_spdx(self, alien_spdx_fullpath: str, tmpdir: str) -> str:
+		"""convert an alien SPDX TV file to RDF in tmpdir, ready to be imported
+		into Fossology, and return the RDF file path"""
 		spdxrdf_basename = f'{os.path.basename(alien_spdx_fullpath)}.rdf'
 		spdxrdf = os.path.join(tmpdir, spdxrdf_basename)
 		spdxtv2rdf(alien_spdx_fullpath, spdxrdf)
-		bash(
-			f"sed -i -E 's/fileName>\\.\\//fileName>{self.fossy_internal_archive_path}\\//g' {spdxrdf}"
-		)
+		self._fix_rdf_filenames(spdxrdf)
+		return spdxrdf
+
+	def _fix_rdf_filenames(self, spdxrdf: str) -> None:
 		# filepaths must match Fossology's internal filepaths otherwise
 		# Fossology's reportImport apparently succeeds but does nothing
-		self.fossy.report_import(self.upload, spdxrdf)
-
+		if os.path.getsize(spdxrdf) == 0:
+			return
+		repl = f"fileName>{self.fossy_internal_archive_path}/".encode()
+		# RDF files may be huge: stream the substitution to a new file,
+		# instead of loading the whole file in memory
+		with open(spdxrdf, "rb") as f, \
+			mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+			open(f"{spdxrdf}.new", "wb") as out:
+			last = 0
+			for m in RE_RDF_FILENAME.finditer(mm):
+				out.write(mm[last:m.start()])
+				out.write(repl)
+				last = m.end()
+			out.write(mm[last:])
+		os.replace(f"{spdxrdf}.new", spdxrdf)
 
-	def import_spdx(self) -> None:
+	def _has_spdx_to_import(self, check_fossy: bool = True) -> bool:
 		if not self.alien_package.internal_archive_name:
 			logger.info(
 				f"[{self.upload.uploadname}] has no internal archive,"
 				" we don't have any alien spdx to upload"
 			)
-			return
-		if self.fossy.check_already_imported_report(self.upload):
+			return False
+		if check_fossy and self.fossy.check_already_imported_report(self.upload):
 			logger.info(
 				f"[{self.upload.uploadname}] not uploading anything, spdx"
 				" report already uploaded before"
 			)
-			return
-		logger.info(f"[{self.uploadname}] Uploading alien SPDX")
+			return False
+		return True
+
+	def _prepare_spdx(self, tmpdir: str) -> List[str]:
+		"""prepare the alien SPDX RDF files to import into Fossology in tmpdir,
+		and return their paths (none, if the alien spdx is too big)"""
+		logger.info(f"[{self.uploadname}] Preparing alien SPDX")
 		fix_spdxtv(self.alien_spdx_filename)
 		uploadname = self.upload.uploadname
 		archive_name = self.alien_package.internal_archive_name
 		# handle fossology's inconsistent behaviour when unpacking archives:
-		if (
-			archive_name.endswith(".tar.gz")
-			or archive_name.endswith(".tar.bz2")
-			or archive_name.endswith(".tgz")
-		):
+		if archive_name.endswith((".tar.gz", ".tar.bz2", ".tgz")):
 			fossy_subfolder, _ = os.path.splitext(archive_name)
-			archive_unpack_path = os.path.join(archive_name, fossy_subfolder)
-		elif archive_name.endswith(".tar.xz") or archive_name.endswith(".zip") or archive_name.endswith(".tar.lz"):
+			archive_unpack_path = f"{archive_name}/{fossy_subfolder}"
+		elif archive_name.endswith((".tar.xz", ".zip", ".tar.lz")):
 			# FIXME: actually, we don't have .zip support in Archive class
 			# FIXME: fossology doesn't have lzip support, upload apparently works but the archive is not unpacked by fossology: fix upstream?
 			archive_unpack_path = archive_name
 		rootfolder = self.alien_package.internal_archive_rootfolder
 		if rootfolder and rootfolder != "." and rootfolder != "./":
 			archive_unpack_path = os.path.join(archive_unpack_path, rootfolder)
-		self.fossy_internal_archive_path = os.path.join(
-			uploadname, archive_unpack_path
-		)
-		self.fossy_internal_archive_path = self.fossy_internal_archive_path.replace('/', '\\/')
+		self.fossy_internal_archive_path = f"{uploadname}/{archive_unpack_path}"
 
 		if os.path.getsize(self.alien_spdx_filename) > 13000000:
 			
@@ -155,7 +239,7 @@ class UploadAliens2Fossy:
 				'Temporary workaround: SPDX file is too big, skipping reportImport for'
 				f' {self.upload.uploadname}'
 			)
-			return
+			return []
 			# end workaround
 
 			logger.info(
@@ -165,29 +249,60 @@ class UploadAliens2Fossy:
 			doc2split, _ = parse_spdx_tv(self.alien_spdx_filename)
 			allfiles = doc2split.package.files
 			splitpoint = int( len(allfiles) / 2 )
-			tmpdir_obj = tempfile.TemporaryDirectory()
-			tmpdir = tmpdir_obj.name
 			part1 = f"part1_{os.path.basename(self.alien_spdx_filename)}"
 			doc2split.package.files = allfiles[:splitpoint]
 			doc2split.package.verif_code = doc2split.package.calc_verif_code()
-			alien_spdx_fullpath = os.path.join(tmpdir, part1)
-			write_spdx_tv(doc2split, alien_spdx_fullpath)
-			self._convert_and_upload_spdx(alien_spdx_fullpath)
+			part1_fullpath = os.path.join(tmpdir, part1)
+			write_spdx_tv(doc2split, part1_fullpath)
 			part2 = f"part2_{os.path.basename(self.alien_spdx_filename)}"
 			doc2split.package.files = allfiles[splitpoint:]
 			doc2split.package.verif_code = doc2split.package.calc_verif_code()
-			alien_spdx_fullpath = os.path.join(tmpdir, part2)
-			write_spdx_tv(doc2split, alien_spdx_fullpath)
-			self._convert_and_upload_spdx(alien_spdx_fullpath)
-		else:
-			self._convert_and_upload_spdx(self.alien_spdx_filename)
+			part2_fullpath = os.path.join(tmpdir, part2)
+			write_spdx_tv(doc2split, part2_fullpath)
+			return [
+				self._convert_spdx(part1_fullpath, tmpdir),
+				self._convert_spdx(part2_fullpath, tmpdir)
+			]
+
+		return [self._convert_spdx(self.alien_spdx_filename, tmpdir)]
+
+	def _import_spdx(self, spdxrdf_list: List[str]) -> None:
+		for spdxrdf in spdxrdf_list:
+			logger.info(f"[{self.uploadname}] Uploading alien SPDX")
+			self.fossy.report_import(self.upload, spdxrdf)
 		# FIXME: add schedule reuser here (optional?)
 
+	def import_spdx(self) -> None:
+		if not self._has_spdx_to_import():
+			return
+		with tempfile.TemporaryDirectory() as tmpdir:
+			self._import_spdx(self._prepare_spdx(tmpdir))
+
+	def run_fossy_scanners_and_import_spdx(self) -> None:
+		"""run fossy scanners and import alien spdx, like run_fossy_scanners
+		and import_spdx do; for new uploads, alien spdx files are prepared
+		for the import while waiting for the scanners to complete"""
+		if not self.uploaded:
+			# the spdx report may have been imported the previous time, and
+			# we can ask Fossology only after the upload has been unpacked
+			self.run_fossy_scanners()
+			self.import_spdx()
+			return
+		if not self._has_spdx_to_import(check_fossy=False):
+			self.run_fossy_scanners()
+			return
+		with tempfile.TemporaryDirectory() as tmpdir:
+			with ThreadPoolExecutor(max_workers=1) as executor:
+				spdxrdf_list = executor.submit(self._prepare_spdx, tmpdir)
+				self.run_fossy_scanners()
+				self._import_spdx(spdxrdf_list.result())
+
 	def get_metadata_from_fossology(self):
 		"""get summary and license findings and conclusions from fossology"""
 		logger.info(f"[{self.uploadname}] getting metadata from fossology")
-		summary = self.fossy.get_summary(self.upload)
-		licenses = self.fossy.get_license_findings_conclusions(self.upload)
+		summary, licenses = self.fossy.get_summary_and_license_findings_conclusions(
+			self.upload
+		)
 		return {
 			"origin": Settings.FOSSY_SERVER,
 			"summary": summary,
@@ -2,12 +2,15 @@
 # SPDX-FileCopyrightText: 2021 Alberto Pianon <pianon@array.eu>
 
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 from time import sleep
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 
 from fossology import Fossology, fossology_token
 from fossology.obj import ReportFormat, TokenScope, Upload
@@ -33,10 +36,22 @@ class FossyWrapperException(Exception):
 	pass
 
 class FossyWrapper:
+
+	# Fossology folders are shared by all instances: serialize their creation,
+	# to avoid creating the same folder twice when uploading in parallel
+	_folder_lock = threading.Lock()
+
 	def __init__(self) -> None:
 		self.fossy_session = requests.Session()
 		self.fossyUI_login()
 		self.fossology = self._connect2fossyAPI()
+		# requests.Session is not thread-safe: API requests made in background
+		# (see get_summary_and_license_findings_conclusions) use their own
+		# keep-alive session, reused for all calls
+		self.fossy_api_bg_session = requests.Session()
+		adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+		self.fossy_api_bg_session.mount("http://", adapter)
+		self.fossy_api_bg_session.mount("https://", adapter)
 
 	def fossyUI_login(self) -> None:
 		self.fossy_session.cookies.clear()
@@ -108,10 +123,11 @@ class FossyWrapper:
 
 	def get_or_create_folder(self, folder: str) -> Folder:
 		logger.info(f'get or create folder "{folder}"')
-		parent = self.fossology.rootFolder
-		components = folder.split("/")
-		for component in components:
-			parent = self.fossology.create_folder(parent, component)
+		with self._folder_lock:
+			parent = self.fossology.rootFolder
+			components = folder.split("/")
+			for component in components:
+				parent = self.fossology.create_folder(parent, component)
 		return parent
 
 	def check_already_uploaded(self, uploadname: str) -> Optional[Upload]:
@@ -285,10 +301,33 @@ class FossyWrapper:
 				f"Unknown error: Fossology API returned status code {res.status_code}"
 			)
 
-	def get_summary(self, upload: Upload) -> Any:
-		res = self.fossology.session.get(f"{self.fossology.api}/uploads/{upload.id}/summary")
+	def get_summary(
+		self,
+		upload: Upload,
+		session: Optional[requests.Session] = None,
+		headers: Optional[Dict[str, str]] = None
+	) -> Any:
+		session = session or self.fossology.session
+		res = session.get(
+			f"{self.fossology.api}/uploads/{upload.id}/summary",
+			headers=headers
+		)
 		return res.json()
 
+	def get_summary_and_license_findings_conclusions(self, upload: Upload) -> Tuple[Any, Any]:
+		"""get summary and license findings and conclusions of an upload; these
+		requests are independent from each other, so the summary is fetched in
+		background, to pay the round trip time of Fossology API only once"""
+		# API headers (with the auth token) are taken from the fossology client
+		# on each call, so that the background session never uses stale ones
+		headers = dict(self.fossology.session.headers)
+		with ThreadPoolExecutor(max_workers=1) as executor:
+			summary = executor.submit(
+				self.get_summary, upload, self.fossy_api_bg_session, headers
+			)
+			licenses = self.get_license_findings_conclusions(upload)
+			return summary.result(), licenses
+
 	def get_spdxtv(self, upload: Upload):
 		logger.info(f"[{upload.uploadname}] Generating spdx report")
 		rep_id = self.fossology.generate_report(
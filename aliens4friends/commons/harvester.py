@@ -1,7 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
 
-import json
 import logging
 import sys
 import re
@@ -16,7 +15,7 @@ from aliens4friends.commons.utils import (get_prefix_formatted,
                                           log_minimal_error)
 from aliens4friends.models.alienmatcher import (AlienMatcherModel,
                                                 AlienSnapMatcherModel)
-from aliens4friends.models.base import BaseModelEncoder
+from aliens4friends.models.base import json_dumps, json_load
 from aliens4friends.models.deltacode import DeltaCodeModel
 from aliens4friends.models.fossy import FossyModel
 from aliens4friends.models.harvest import (AuditFindings, BinaryPackage,
@@ -30,6 +29,14 @@ from aliens4friends.models.tinfoilhat import PackageWithTags, TinfoilHatModel
 
 logger = logging.getLogger(__name__)
 
+# License IDs in Fossology license lists, which are not licenses
+FOSSY_LICENSE_SKIP_LIST = frozenset([
+	"Dual-license"
+])
+
+# Release tags of development snapshots, ex. "v1.0-12-gdeadbeef"
+RE_SNAPSHOT_RELEASE = re.compile(r'^.+-g[0-9a-f]+$')
+
 class HarvestException(Exception):
 	pass
 
@@ -74,6 +81,8 @@ class Harvester:
 		self.package_id_ext = package_id_ext
 		self.add_missing = add_missing
 		self.with_binaries = with_binaries
+		# str.startswith accepts a tuple of prefixes
+		self._with_binaries_prefixes = tuple(with_binaries) if with_binaries else ()
 		self.use_oldmatcher = use_oldmatcher
 		self.session = session
 
@@ -166,10 +175,9 @@ class Harvester:
 						model.match.version
 					)
 				elif ext == FILETYPE.SCANCODE:
-					with open(path) as f:
-						sc = json.load(f)
+					sc = json_load(path)
 					self.package_groups[group_id]['scancode'] = {
-						'upstream_source_total' : sum([1 for f in sc['files'] if f['type'] == 'file'])
+						'upstream_source_total' : sum(1 for f in sc['files'] if f['type'] == 'file')
 					}
 				elif ext == FILETYPE.DELTACODE:
 					dc = DeltaCodeModel.from_file(path)
@@ -290,7 +298,7 @@ class Harvester:
 			filtered_release_tags = []
 			for release in source_package.tags['release']:
 				if (
-					re.match(r'^.+-g[0-9a-f]+$', release)
+					RE_SNAPSHOT_RELEASE.match(release)
 					and release != snapshot_release
 				):
 					continue
@@ -309,8 +317,8 @@ class Harvester:
 				self.result_file
 			)
 		else:
-			with open(self.result_file, 'w') as f:
-				json.dump(self.result, f, indent = 2, cls = BaseModelEncoder)
+			with open(self.result_file, 'wb') as f:
+				f.write(json_dumps(self.result, indent=True))
 
 	def _parse_aliensrc_main(self, path, source_package: SourcePackage) -> None:
 		apkg = AlienPackage(path)
@@ -334,12 +342,9 @@ class Harvester:
 		if not cur:
 			return result
 
-		SKIP_LIST = [
-			"Dual-license"
-		]
 		seen = set()
 		for license_id in cur:
-			if license_id in SKIP_LIST:
+			if license_id in FOSSY_LICENSE_SKIP_LIST:
 				continue
 			license_id = License(license_id).encode()
 			if license_id in seen:
@@ -392,10 +397,7 @@ class Harvester:
 		)
 
 	def _parse_tinfoilhat_tag_filter(self, tag: str) -> bool:
-		for prefix in self.with_binaries:
-			if tag.startswith(prefix):
-				return True
-		return False
+		return tag.startswith(self._with_binaries_prefixes)
 
 	def _parse_tinfoilhat_packages(self, cur: Dict[str, PackageWithTags]) -> List[BinaryPackage]:
 		result = []
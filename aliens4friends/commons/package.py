@@ -4,7 +4,9 @@
 import os
 import sys
 import json
+import hashlib
 import logging
+import tempfile
 from typing import Union, List, Optional, Dict, Any
 from pathlib import Path
 
@@ -12,6 +14,7 @@ from .archive import Archive, ArchiveError
 from .version import Version
 
 from aliens4friends.models.aliensrc import AlienSrc, InternalArchive
+from aliens4friends.models.base import json_dumps, json_load
 from aliens4friends.models.common import SourceFile
 
 logger = logging.getLogger(__name__)
@@ -134,7 +137,17 @@ class AlienPackage(Package):
 			check_checksums: Optional[bool] = False,
 			get_internal_archive_checksums: Optional[bool] = False,
 			get_internal_archive_rootfolders: Optional[bool] = False,
+			cache_dir: Optional[str] = None
 		) -> None:
+		"""
+		Expand the alien package, that is, find its internal archives, and get
+		their checksums and root folders, if requested.
+
+		If cache_dir is given, internal archive results are cached there, and
+		reused as long as the aliensrc file does not change (same size and
+		mtime), since they require to read the whole archive. Results are never
+		taken from the cache if check_checksums is set.
+		"""
 		# We need this step only once for each instance...
 		if self.expanded:
 			return
@@ -161,6 +174,22 @@ class AlienPackage(Package):
 		self.internal_archive_src_uri = None
 		self.internal_archives = []
 
+		cache_file = None
+		if cache_dir and not check_checksums:
+			cache_file = self._expand_cache_file(
+				cache_dir,
+				get_internal_archive_checksums,
+				get_internal_archive_rootfolders
+			)
+			internal_archives = self._load_expand_cache(cache_file)
+			if internal_archives is not None:
+				logger.debug(
+					f"[{self.name}-{self.version.str}] internal archives taken from cache"
+				)
+				self.internal_archives = internal_archives
+				self._set_internal_primary_archive()
+				return
+
 		count_files = 0
 		for src_file in self.package_files:
 
@@ -214,7 +243,12 @@ class AlienPackage(Package):
 				f" inside {self.ALIEN_MATCHER_JSON} of package {self.name}-{self.version.str}:"
 				" maybe a duplicate file entry?"
 			)
+		if cache_file:
+			self._write_expand_cache(cache_file)
 
+		self._set_internal_primary_archive()
+
+	def _set_internal_primary_archive(self) -> None:
 		primary = None
 		if len(self.internal_archives) == 1:
 			primary = self.internal_archives[0]
@@ -255,6 +289,56 @@ class AlienPackage(Package):
 				" and no primary archive detected"
 			)
 
+	def _expand_cache_file(
+		self,
+		cache_dir: str,
+		get_internal_archive_checksums: Optional[bool],
+		get_internal_archive_rootfolders: Optional[bool]
+	) -> str:
+		# one cache file for each aliensrc file: when the aliensrc file changes,
+		# its cache file gets stale and is overwritten (see _expand_cache_stamp)
+		key = (
+			f"{os.path.abspath(self.archive_fullpath)}:"
+			f"{bool(get_internal_archive_checksums)}:{bool(get_internal_archive_rootfolders)}"
+		)
+		digest = hashlib.sha1(key.encode()).hexdigest()
+		return os.path.join(cache_dir, f"{digest}.expand.json")
+
+	def _expand_cache_stamp(self) -> List[int]:
+		st = os.stat(self.archive_fullpath)
+		return [st.st_size, st.st_mtime_ns]
+
+	def _load_expand_cache(self, cache_file: str) -> Optional[List[InternalArchive]]:
+		try:
+			cached = json_load(cache_file)
+			if cached["stamp"] != self._expand_cache_stamp():
+				return None
+			return InternalArchive.drilldown(cached["internal_archives"])
+		except FileNotFoundError:
+			return None
+		except Exception as ex:
+			logger.warning(
+				f"[{self.name}-{self.version.str}] ignoring broken cache file"
+				f" {cache_file}: {ex}"
+			)
+			return None
+
+	def _write_expand_cache(self, cache_file: str) -> None:
+		# write to a temporary file first, and then move it: other processes
+		# or threads could be reading or writing the same cache file at the
+		# same time
+		with tempfile.NamedTemporaryFile(
+			dir=os.path.dirname(cache_file),
+			prefix=f"{os.path.basename(cache_file)}.",
+			suffix=".tmp",
+			delete=False
+		) as f:
+			f.write(json_dumps({
+				"stamp": self._expand_cache_stamp(),
+				"internal_archives": self.internal_archives
+			}))
+		os.replace(f.name, cache_file)
+
 	def has_internal_primary_archive(self) -> bool:
 		return self.internal_archive_name and len(self.internal_archive_name) > 0  #pytype: disable=bad-return-type
 
@@ -2,9 +2,10 @@
 # SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
 
 import os
+import re
 import logging
+from fnmatch import translate as fnmatch_translate
 from enum import IntEnum, Enum
-from json import dump as jsondump, load as jsonload
 from pathlib import Path
 from shutil import rmtree
 from typing import Generator, Any, Set, Union, Tuple
@@ -16,7 +17,7 @@ from .utils import copy, mkdir, get_prefix_formatted
 from .settings import Settings
 from .archive import Archive
 
-from aliens4friends.models.base import BaseModelEncoder, BaseModel, ModelError
+from aliens4friends.models.base import BaseModel, ModelError, json_dumps, json_load
 from aliens4friends.commons.spdxutils import write_spdx_tv
 from aliens4friends.commons.utils import bash, sha1sum
 
@@ -59,6 +60,9 @@ class Pool:
 	def __init__(self, basepath: str) -> None:
 		super().__init__()
 		self.basepath = os.path.abspath(basepath)
+		# Precomputed once, abspath/clnpath are called for nearly every
+		# pool access
+		self._basepath_prefix = f"{self.basepath}/"
 		self.mkdir()
 		if not os.path.isdir(self.basepath):
 			raise NotADirectoryError(
@@ -181,8 +185,7 @@ class Pool:
 
 	def packageinfo_from_path(self, path: Union[str, Path]):
 		p = str(path).split("/")
-		path = os.path.basename(path)
-		package_id, mainext = os.path.splitext(path)
+		package_id, mainext = os.path.splitext(p[-1])
 		if mainext == f".{FILETYPE.ALIENSRC}":
 			ext = mainext
 		else:
@@ -235,8 +238,8 @@ class Pool:
 	def clnpath(self, path: Union[Path, str]) -> str:
 		if isinstance(path, Path):
 			path = os.path.join(path)
-		if path.startswith(f"{self.basepath}/"):
-			return path[len(self.basepath) + 1:]
+		if path.startswith(self._basepath_prefix):
+			return path[len(self._basepath_prefix):]
 
 		if path.startswith(os.path.sep):
 			raise PoolError(f'Path {path} is outside the pool!')
@@ -249,7 +252,10 @@ class Pool:
 	def relpath(self, *sub_folders: str) -> str:
 		result = ""
 		if sub_folders:
-			result = os.path.join(*sub_folders)
+			if len(sub_folders) == 1:
+				result = sub_folders[0]
+			else:
+				result = os.path.join(*sub_folders)
 			if result.startswith(os.path.sep):
 				raise PoolError(f'Path {result} is not a relative path: sub_folders must be relative!')
 		return result
@@ -258,13 +264,12 @@ class Pool:
 		if sub_folders:
 			if sub_folders[0].startswith(os.path.sep):
 				path = os.path.join(*sub_folders)
-				if not path.startswith(f"{self.basepath}/"):
+				if not path.startswith(self._basepath_prefix):
 					raise PoolError(f'Path {path} is outside the pool!')
 				return path
-			return os.path.join(
-				self.basepath,
-				self.relpath(*sub_folders)
-			)
+			# relpath() guarantees a relative path, so a plain concatenation
+			# gives the same result as os.path.join
+			return self._basepath_prefix + self.relpath(*sub_folders)
 		return self.basepath
 
 	def _upsertlink(self, dest: str, link: str, target: str) -> None:
@@ -328,8 +333,8 @@ class Pool:
 		if src_type == SRCTYPE.PATH:
 			copy(src, dest_full)
 		elif src_type == SRCTYPE.JSON:
-			with open(dest_full, 'w') as f:
-				jsondump(src, f, indent = 2, cls = BaseModelEncoder)
+			with open(dest_full, 'wb') as f:
+				f.write(json_dumps(src, indent=True))
 		elif src_type == SRCTYPE.TEXT:
 			with open(dest_full, 'wb+') as f:
 				f.write(src)
@@ -440,9 +445,7 @@ class Pool:
 		return self._get(True, *path_args) #pytype: disable=bad-return-type
 
 	def get_json(self, *path_args: str) -> Any:
-		path = self.abspath(*path_args)
-		with open(path, "r") as f:
-			return jsonload(f)
+		return json_load(self.abspath(*path_args))
 
 	def _get(self, binary: bool, *path_args: str) -> Union[bytes, str]:
 		path = self.abspath(*path_args)
@@ -451,8 +454,32 @@ class Pool:
 			return f.read()
 
 	def absglob(self, glob: str, *path_args: str) -> Generator[Path, None, None]:
+		"""Find files recursively, like Path.rglob(glob) does, that is, the last
+		path components of each result must match the path components of glob.
+
+		We walk the directory tree only once with os.walk (which is based on
+		os.scandir), while rglob scans subfolders again for each folder it
+		visits, when the glob contains more than one path component."""
 		path = self.abspath(*path_args)
-		return Path(path).rglob(glob)
+		matchers = [
+			re.compile(fnmatch_translate(component)).match
+			for component in glob.split("/")
+		]
+		depth = len(matchers)
+		file_matcher = matchers[-1]
+		dir_matchers = matchers[:-1]
+		for dirpath, _, filenames in os.walk(path):
+			if dir_matchers:
+				dir_components = dirpath[len(path):].split(os.path.sep)[1:]
+				if len(dir_components) < depth - 1:
+					continue
+				if not all(
+					m(c) for m, c in zip(dir_matchers, dir_components[1 - depth:])
+				):
+					continue
+			for filename in filenames:
+				if file_matcher(filename):
+					yield Path(dirpath, filename)
 
 	def rm(self, *path_args: str) -> None:
 		path = self.abspath(*path_args)
@@ -467,7 +494,9 @@ class Pool:
 
 	def is_empty(self, *path_args: str) -> bool:
 		path = self.abspath(*path_args)
-		return not os.listdir(path)
+		# stop at the first entry, instead of listing the whole directory
+		with os.scandir(path) as entries:
+			return next(entries, None) is None
 
 	def cached(self, path_in_pool: str, is_dir: bool = False, debug_prefix: str = "") -> bool:
 		if not Settings.POOLCACHED:
@@ -12,7 +12,8 @@ from spdx.file import File as SPDXFile
 from spdx.utils import NoAssert, SPDXNone
 
 from aliens4friends.commons.package import AlienPackage
-from aliens4friends.commons.spdxutils import EMPTY_FILE_SHA1
+from aliens4friends.commons.spdxutils import (EMPTY_FILE_SHA1, calc_verif_code,
+                                              get_files_sha1)
 from aliens4friends.commons.utils import md5
 from aliens4friends.models.deltacode import DeltaCodeModel
 from aliens4friends.commons.debian2spdx import SPDX_LICENSE_IDS
@@ -40,7 +41,9 @@ class Scancode2AlienSPDX:
 		self.alien_spdx.package.supplier = None
 		self.alien_spdx.package.comment = self.alien_package.metadata.get('comment')
 		self.alien_spdx.package.download_location = self.alien_package.internal_archive_src_uri
-		self.alien_spdx.package.verif_code = self.alien_spdx.package.calc_verif_code()
+		self.alien_spdx.package.verif_code = calc_verif_code(
+			get_files_sha1(self.alien_spdx.package.files)
+		)
 		self.alien_spdx.package.spdx_id = f"SPDXRef-{self.alien_package.name}-{self.alien_package.version.str}"
 		self.alien_spdx.namespace = (
 			f"http://spdx.org/spdxdocs/{self.alien_package.name}-{self.alien_package.version.str}-{uuid4()}"
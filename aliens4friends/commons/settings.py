@@ -43,6 +43,12 @@ class Settings:
 	except KeyError:
 		PRINTRESULT = DOTENV["A4F_PRINTRESULT"] = False
 
+	try:
+		UPLOAD_WORKERS = int(DOTENV["A4F_UPLOAD_WORKERS"])
+	except KeyError:
+		UPLOAD_WORKERS = 1
+		DOTENV["A4F_UPLOAD_WORKERS"] = str(UPLOAD_WORKERS)
+
 	try:
 		SPDX_TOOLS_CMD = DOTENV["SPDX_TOOLS_CMD"]
 	except KeyError:
@@ -354,8 +354,13 @@ class AlienSnapMatcher:
 				else:
 					continue
 			else:
-				similarity = Calc.levenshtein(name_needle, pkg["package"])
 				fuzzy_score = Calc.fuzzy_package_score(name_needle, pkg["package"])
+				# the edit distance is needed only for candidates we keep, so
+				# do not calculate it for packages that do not match at all
+				similarity = (
+					Calc.levenshtein(name_needle, pkg["package"])
+					if fuzzy_score > 0 else 0
+				)
 
 			# logger.debug(f"[{apkg.name}] vs { pkg['package'] } / { fuzzy_score }")
 
@@ -3,19 +3,30 @@
 
 import os
 import re
+import hashlib
 from uuid import uuid4
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple
 
 from spdx.parsers.tagvalue import Parser as SPDXTagValueParser
 from spdx.parsers.tagvaluebuilders import Builder as SPDXTagValueBuilder
 from spdx.writers.tagvalue import write_document as tv_write_document
 from spdx.document import Document as SPDXDocument
+from spdx.file import File as SPDXFile
 
 from aliens4friends.commons.utils import bash
 from aliens4friends.commons.settings import Settings
 
 EMPTY_FILE_SHA1 = "da39a3ee5e6b4b0d3255bfef95601890afd80709"
 
+# max number of files hashed in parallel by get_files_sha1
+SHA1_WORKERS = 8
+
+# characters that are invalid in XML
+RE_INVALID_XML_CHARS = re.compile(
+	r"[^\x09\x0A\x0D\x20-\uD7FF\uE000-\uFFFD\u10000-\u10FFFF]"
+)
+
 class SPDXWriterLogger:
 	def log(self, _):
 		pass # do not log errors, they are returned by parse method
@@ -39,11 +50,40 @@ def write_spdx_tv(spdx_doc_obj: SPDXDocument, filename: str) -> None:
 	with open(filename, "w") as f:
 		tv_write_document(spdx_doc_obj, f, validate=False)
 
+def get_files_sha1(spdx_files: List[SPDXFile]) -> List[str]:
+	"""get SHA1 checksums of SPDX files, as spdx.package.Package.calc_verif_code
+	does: use the checksum found in SPDX data, if present, and calculate it from
+	the actual file otherwise (hashing files in parallel, since hashlib releases
+	the GIL)"""
+	sha1s = []
+	to_calc = []
+	for i, spdx_file in enumerate(spdx_files):
+		chk_sum = spdx_file.chk_sum
+		if chk_sum and chk_sum.identifier == 'SHA1':
+			sha1s.append(chk_sum.value)
+		else:
+			sha1s.append(None)
+			to_calc.append(i)
+	if to_calc:
+		with ThreadPoolExecutor(max_workers=SHA1_WORKERS) as executor:
+			calculated = executor.map(
+				lambda i: spdx_files[i].calc_chksum(),
+				to_calc
+			)
+			for i, sha1 in zip(to_calc, calculated):
+				sha1s[i] = sha1
+	return sha1s
+
+def calc_verif_code(sha1s: Iterable[str]) -> str:
+	"""calculate a SPDX package verification code out of the SHA1 checksums of
+	its files (see get_files_sha1)"""
+	return hashlib.sha1("".join(sorted(sha1s)).encode("utf-8")).hexdigest()
+
 def fix_spdxtv(spdxtv_path: str) -> None:
 	"""fix SPDX TagValue file generated by ScanCode"""
 	# TODO: check when these bugs are fixed upstream in ScanCode
 	with open(spdxtv_path) as f:
-		spdxtv = f.read()
+		orig_spdxtv = spdxtv = f.read()
 
 	spdxtv_basename = os.path.basename(spdxtv_path)
 	if "DocumentNamespace:" not in spdxtv:
@@ -64,11 +104,14 @@ def fix_spdxtv(spdxtv_path: str) -> None:
 		"FileChecksum: SHA1: \n",
 		"FileChecksum: SHA1: da39a3ee5e6b4b0d3255bfef95601890afd80709\n",
 	)
-	spdxtv = re.sub(
-		r"[^\x09\x0A\x0D\x20-\uD7FF\uE000-\uFFFD\u10000-\u10FFFF]",
+	spdxtv = RE_INVALID_XML_CHARS.sub(
 		"",
 		spdxtv
 	) # remove characters that are invalid in XML (ready for RDF conversion)
+	if spdxtv == orig_spdxtv:
+		# already fixed (ex. by a previous run): do not rewrite the file, and
+		# do not touch its mtime
+		return
 	with open(spdxtv_path, 'w') as f:
 		f.write(spdxtv)
 
@@ -6,6 +6,7 @@ import inspect
 from datetime import datetime
 import os
 import hashlib
+import shutil
 import logging
 import traceback
 from typing import Tuple, Type, Optional, List, Any, Callable
@@ -93,9 +94,9 @@ def md5sum (file_path: str) -> str:
 	return stdout.split(' ', 1)[0]
 
 def copy(src_filename: str, dst_filename: str) -> None:
-	with open(src_filename, 'rb') as fr:
-		with open(dst_filename, 'wb') as fw:
-			fw.write(fr.read())
+	# copyfile uses in-kernel copies where possible (sendfile on Linux), without
+	# reading the whole file into memory
+	shutil.copyfile(src_filename, dst_filename)
 
 def mkdir(*sub_folders: str) -> str:
 	path = os.path.join(*sub_folders)
@@ -2,6 +2,7 @@
 # SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
 
 import re
+from functools import lru_cache
 from typing import Any, Optional, TypeVar, Union
 
 from debian.debian_support import Version as DebVersion
@@ -9,6 +10,11 @@ from packaging.version import Version as PkgVersion
 
 _TVersion = TypeVar('_TVersion', bound='Version')
 
+_RE_TCP_WRAPPERS = re.compile(r'(\d+\.\d+\.)q-(\d+)')
+
+# Taken from https://semver.org/
+_RE_SEMVER = re.compile(r'^(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)(?:-(?P<prerelease>(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?(?:\+(?P<buildmetadata>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$')
+
 class VersionError(Exception):
 	pass
 
@@ -44,6 +50,16 @@ class Version:
 		self._make_debian_version()
 		self._make_package_version()
 
+	@classmethod
+	@lru_cache(maxsize=4096)
+	def parsed(cls, version_str: str, remove_epoc: bool = True) -> 'Version':
+		"""
+		Memoized constructor: the same version strings are parsed over and over
+		when matching, so return a shared instance for each of them. Version
+		objects must therefore never be changed after creation.
+		"""
+		return cls(version_str, remove_epoc)
+
 	def _make_package_version(self) -> None:
 		try:
 			self.package_version = PkgVersion(self.str)
@@ -136,7 +152,23 @@ class Version:
 		return n
 
 	def similarity(self, other_version: Union[_TVersion, Any]) -> float:
-		dist = self.distance(other_version, True)
+		if not isinstance(other_version, Version):
+			return Version._similarity(self, other_version)
+		return Version._similarity_str(self.str, other_version.str)
+
+	# The result only depends on both version strings, hence we can safely
+	# memoize it, keyed on strings rather than on Version objects
+	@staticmethod
+	@lru_cache(maxsize=16384)
+	def _similarity_str(version_str: str, other_version_str: str) -> float:
+		return Version._similarity(
+			Version.parsed(version_str, False),
+			Version.parsed(other_version_str, False)
+		)
+
+	@staticmethod
+	def _similarity(version: 'Version', other_version: Union[_TVersion, Any]) -> float:
+		dist = version.distance(other_version, True)
 
 		if dist == 0:
 			return 100
@@ -197,15 +229,12 @@ class Version:
 
 	@staticmethod
 	def _fix_tcp_wrappers_version(vers_str: str) -> str:
-		p = re.compile('(\d+\.\d+\.)q-(\d+)')
-		m = p.match(vers_str)
+		m = _RE_TCP_WRAPPERS.match(vers_str)
 		if m:
 			return ''.join(m.groups())
 		return vers_str
 
 	@staticmethod
 	def _is_semver(vers_str: str) -> bool:
-		# Taken from https://semver.org/
-		p = re.compile("^(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)(?:-(?P<prerelease>(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?(?:\+(?P<buildmetadata>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$")
-		m = p.match(vers_str)
+		m = _RE_SEMVER.match(vers_str)
 		return True if m else False
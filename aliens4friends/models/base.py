@@ -2,9 +2,17 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from json import JSONEncoder, dumps, load as jsonload
+import os
+import mmap
+from json import JSONEncoder, dumps, loads
 from typing import Optional, Union, TypeVar, List, Type, Dict, Any
 
+import orjson
+
+# JSON files smaller than this are read with a plain read(), for bigger ones
+# memory mapping is cheaper than copying the whole file into a Python buffer
+MMAP_MIN_SIZE = 64 * 1024
+
 _TBaseModel = TypeVar('_TBaseModel', bound='BaseModel')
 class BaseModel():
 	"""
@@ -106,8 +114,7 @@ class BaseModel():
 		Returns:
 			cls: class instance of cls
 		"""
-		with open(path) as f:
-			jl = jsonload(f)
+		jl = json_load(path)
 		try:
 			return cls(**jl)
 		except TypeError:
@@ -147,8 +154,7 @@ class DictModel(BaseModel):
 		cls: Type[_TDictModel],
 		path: str
 	) -> _TDictModel:
-		with open(path) as f:
-			jl = jsonload(f)
+		jl = json_load(path)
 		return cls(jl)
 
 	@classmethod
@@ -211,10 +217,69 @@ class DictModel(BaseModel):
 class ModelError(Exception):
 	pass
 
+def _encode_default(obj: BaseModel) -> Union[Dict[str, Any], List[str]]:
+	if isinstance(obj, BaseModel):
+		return obj.encode()
+	if isinstance(obj, set):
+		return list(obj)
+	raise ModelError(f"Unhandled instance type '{type(obj)}' found for '{obj}'")
+
 class BaseModelEncoder(JSONEncoder):
 	def default(self, obj: BaseModel) -> Union[Dict[str, Any], List[str]]:
-		if isinstance(obj, BaseModel):
-			return obj.encode()
-		if isinstance(obj, set):
-			return list(obj)
-		raise ModelError(f"Unhandled instance type '{type(obj)}' found for '{obj}'")
+		return _encode_default(obj)
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+	"""
+	Serialize models (and any other JSON compatible object) into UTF-8 encoded
+	JSON with orjson, which is much faster than the standard json library,
+	especially when indenting the output.
+
+	Unlike json.dumps, non-ASCII characters are not escaped, and compact
+	separators are used when not indenting. Strings that can't be encoded in
+	UTF-8 (like surrogate-escaped file names coming from tarballs or os APIs)
+	are not supported by orjson: in that case we fall back to the standard
+	json library, which escapes them.
+
+	Args:
+		obj: object to serialize
+		indent: indent the output with 2 spaces
+
+	Returns:
+		bytes: JSON of obj
+	"""
+	option = orjson.OPT_NON_STR_KEYS
+	if indent:
+		option |= orjson.OPT_INDENT_2
+	try:
+		return orjson.dumps(obj, default=_encode_default, option=option)
+	except TypeError:
+		return dumps(
+			obj, cls=BaseModelEncoder, indent=2 if indent else None
+		).encode()
+
+def json_load(path: str) -> Any:
+	"""
+	Load a JSON file with orjson. Big files are memory mapped and parsed
+	without copying them into a Python buffer first.
+
+	Args:
+		path: path to the json file
+
+	Returns:
+		Any: deserialized JSON content
+	"""
+	with open(path, "rb") as f:
+		if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+			data = f.read()
+			try:
+				return orjson.loads(data)
+			except orjson.JSONDecodeError:
+				# escaped surrogates, written by json_dumps fallback
+				return loads(data)
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			try:
+				with memoryview(mm) as buf:
+					return orjson.loads(buf)
+			except orjson.JSONDecodeError:
+				# escaped surrogates, written by json_dumps fallback
+				return loads(mm[:])
@@ -4,29 +4,54 @@
 from aliens4friends.commons.pool import Pool
 from aliens4friends.commons.settings import Settings
 import os
-from aliens4friends.commands.match import AlienMatcher, AlienMatcherError
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from aliens4friends.commons.alienmatcher import AlienMatcher, AlienMatcherError
 from aliens4friends.commons.package import PackageError, Package, DebianPackage
 
 IGNORE_CACHE = True
 
+SCA_PATH = Path.cwd() / "tmp" / "alberto" / "SCA"
+
+# One matcher for each worker process, so the Debian sources list gets loaded
+# only once per process
+_matcher = None
+
 def _setup():
 	print(f"{'ALIENSRC':<80}{'OUTCOME':<10}{'DEBSRC_DEBIAN':<60}{'DEBSRC_ORIG':<60}ERRORS")
 	print("-"*300)
-	return AlienMatcher(), os.path.join(os.getcwd(), "tmp", "alberto", "SCA")
+	return AlienMatcher(Pool(Settings.POOLPATH)), SCA_PATH
+
+def _match_one(path):
+	global _matcher
+	if not _matcher:
+		_matcher = AlienMatcher(Pool(Settings.POOLPATH))
+	try:
+		return _matcher.match(path)
+	except AlienMatcherError as ex:
+		print(ex)
 
 def test_all():
 	_, path = _setup()
-	AlienMatcher.execute(os.path.join(path, "*.aliensrc"))
+	# DirEntry objects carry the file type already, no extra stat needed
+	with os.scandir(path) as entries:
+		paths = sorted(
+			entry.path for entry in entries
+			if entry.name.endswith(".aliensrc") and entry.is_file()
+		)
+	# Each package is independent from the others
+	with ProcessPoolExecutor() as executor:
+		list(executor.map(_match_one, paths, chunksize=4))
 
 
 def test_single():
 	matcher, path = _setup()
-	matcher.run(os.path.join(path, "alien-packagegroup-base-1.0.aliensrc"))
+	matcher.match(path / "alien-packagegroup-base-1.0.aliensrc")
 
 def test_search():
 	# matcher, path = _setup()
-	# package = AlienPackage(os.path.join(path, "alien-libmodulemd-v1-1.8.16.aliensrc"))
-	matcher = AlienMatcher()
+	# package = AlienPackage(path / "alien-libmodulemd-v1-1.8.16.aliensrc")
+	matcher = AlienMatcher(Pool(Settings.POOLPATH))
 	package = Package("linux-yocto", "5.4.69+gitAUTOINC+7f765dcb29_cfcdd63145")
 	package_match = matcher.search(package)
 	print(package_match)
@@ -53,7 +78,7 @@ def test_list():
 	]
 
 	for p in packages:
-		matcher.run(os.path.join(path, p))
+		matcher.match(path / p)
 
 from multiprocessing import Pool as MultiProcessingPool
 
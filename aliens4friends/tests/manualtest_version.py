@@ -1,65 +1,108 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
 
+import argparse
 import csv
+import sys
+from operator import itemgetter
 from aliens4friends.commons.calc import Calc
 
 from aliens4friends.commons.version import Version, VersionError
 
+def _version_score(name, match_name, v1, v2):
+	version_score = v1.similarity(v2) if v1 and v2 else 0
+	return version_score, "", ""
+
+def _package_score(name, match_name, v1, v2):
+	return "", Calc.fuzzy_package_score(name, match_name), ""
+
+def _full_score(name, match_name, v1, v2):
+	version_score = v1.similarity(v2) if v1 and v2 else 0
+	package_score = Calc.fuzzy_package_score(name, match_name)
+	return (
+		version_score,
+		package_score,
+		Calc.overallScore(package_score, version_score)
+	)
+
+# Scoring modes: each one returns a (v_score, p_score, score) tuple
+MODES = {
+	"simple": _version_score,
+	"with-package": _package_score,
+	"full": _full_score,
+}
+
 results = []
 
 if __name__ == '__main__':
 
-	with open('matchResults.csv') as f:
-		reader = csv.reader(f)
-		c = 0
-		for rec in reader:
-			c += 1
-			if c == 1:
-				header = [
-					rec[0],
-					"v1",
-					"v2",
-					"v_score",
-					"p_score",
-					"score",
-					rec[12],
-					"error"
-				]
-				continue
-			alien_version = rec[5]
-			match_version = rec[6]
+	parser = argparse.ArgumentParser()
+	parser.add_argument(
+		"--mode",
+		choices=MODES.keys(),
+		default="full",
+		help="Which scores to compute (default: full)"
+	)
+	parser.add_argument(
+		"csvfile",
+		nargs="?",
+		default="matchResults.csv",
+		help="CSV file with match results (default: matchResults.csv)"
+	)
+	args = parser.parse_args()
+	score = MODES[args.mode]
 
+	# First pass: parse all versions of the CSV, and collect parsing errors
+	# per row. Scoring happens afterwards in a single batch.
+	# Columns: 0 = name, 1 = match name, 5 = alien version, 6 = match version,
+	#          12 = outcome
+	columns = itemgetter(0, 1, 5, 6, 12)
+	rows = []
+	with open(args.csvfile) as f:
+		reader = csv.reader(f)
+		name, _, _, _, outcome = columns(next(reader))
+		header = [
+			name,
+			"v1",
+			"v2",
+			"v_score",
+			"p_score",
+			"score",
+			outcome,
+			"error"
+		]
+		for name, match_name, alien_version, match_version, outcome in map(columns, reader):
+			# Package names repeat a lot: interning them makes duplicates share
+			# storage, and makes the comparisons in sorted() and in the
+			# fuzzy_package_score cache lookups identity checks
+			name = sys.intern(name)
+			match_name = sys.intern(match_name)
+			v1 = None
+			v2 = None
 			error = ""
 			try:
-				v1 = Version(alien_version)
-				v2 = Version(match_version)
-				version_score = v1.similarity(v2)
+				v1 = Version.parsed(alien_version)
+				v2 = Version.parsed(match_version)
 			except VersionError as ex:
 				error = str(ex)
-				#continue
-
-			package_score = Calc.fuzzy_package_score(rec[0], rec[1])
+			rows.append((name, match_name, outcome, v1, v2, error))
 
-			results.append(
-				[
-					rec[0],
-					v1.str_simple if v1 else "",
-					v2.str_simple if v2 else "",
-					version_score,
-					package_score,
-					Calc.overallScore(package_score, version_score),
-					rec[12],
-					error
-				]
-			)
-			v1 = None
-			v2 = None
-			version_score = 0
-			package_score = 0
-			# if c == 40:
-			# 	break
+	# Second pass: compute all scores of the selected mode
+	for name, match_name, outcome, v1, v2, error in rows:
+		results.append(
+			[
+				name,
+				v1.str_simple if v1 else "",
+				v2.str_simple if v2 else "",
+				*score(name, match_name, v1, v2),
+				outcome,
+				error
+			]
+		)
 
-	print(f"{header[0]:<45}{header[1]:<12}{header[2]:<12}{header[3]:<12}{header[4]:<12}{header[5]:<12}{header[6]:<12}{header[7]}")
-	for r in sorted(results):
-		print(f"{r[0]:<45}{r[1]:<12}{r[2]:<12}{r[3]:<12}{r[4]:<12}{r[5]:<12}{r[6]:<12}{r[7]}")
+	# Collect all lines and write them at once, instead of one print per row
+	row_format = "{:<45}{:<12}{:<12}{:<12}{:<12}{:<12}{:<12}{}".format
+	out = [row_format(*header)]
+	out.extend(row_format(*r) for r in sorted(results))
+	out.append("")
+	sys.stdout.write("\n".join(out))
@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+
+from aliens4friends.commons.calc import Calc
+
+class TestingCalc(unittest.TestCase):
+
+	def test_levenshtein(self):
+		inputs = [
+			["", "", 0],
+			["abc", "", 3],
+			["", "abc", 3],
+			["kitten", "sitting", 3],
+			["sitting", "kitten", 3],
+			["gnutls", "gnutls28", 2],
+			["flaw", "lawn", 2],
+		]
+		for first, second, expect in inputs:
+			self.assertEqual(Calc.levenshtein(first, second), expect)
+
+if __name__ == '__main__':
+	unittest.main()
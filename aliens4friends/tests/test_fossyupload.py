@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+import shutil
+import tarfile
+import tempfile
+import io
+import socket
+from types import SimpleNamespace
+from unittest import mock
+
+from aliens4friends.commons.settings import Settings
+from aliens4friends.commons.fossyupload import UploadAliens2Fossy, _fossy_is_local, _host_is_local
+
+LONG_DIR = "d" * 120
+
+def _getaddrinfo(ips):
+	"""fake socket.getaddrinfo, resolving any host to ips"""
+	return lambda host, port: [
+		(socket.AF_INET6 if ":" in ip else socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, 0))
+		for ip in ips
+	]
+
+class TestingUploadAliens2Fossy(unittest.TestCase):
+
+	def setUp(self):
+		self.tmpdir = tempfile.mkdtemp(prefix="a4f-tests-")
+		self.fossy_server = Settings.FOSSY_SERVER
+		_host_is_local.cache_clear()
+		aliensrc = f"{self.tmpdir}/pkg.aliensrc"
+		with tarfile.open(aliensrc, "w", format=tarfile.PAX_FORMAT) as tar:
+			self._add(tar, "aliensrc.json", b"{}")
+			self._add(tar, "files/short.c", b"short")
+			self._add(tar, f"files/{LONG_DIR}/x.c", b"long")
+			self._add(tar, "files/é.c", b"non-ascii")
+			link = tarfile.TarInfo(f"files/{LONG_DIR}/link.c")
+			link.type = tarfile.LNKTYPE
+			link.linkname = f"files/{LONG_DIR}/x.c"
+			tar.addfile(link)
+		# build just what _make_upload_archive needs
+		self.a2f = UploadAliens2Fossy.__new__(UploadAliens2Fossy)
+		self.a2f.uploadname = "pkg@1.0-r0"
+		self.a2f.alien_package = SimpleNamespace(
+			archive=SimpleNamespace(path=aliensrc)
+		)
+
+	def tearDown(self):
+		Settings.FOSSY_SERVER = self.fossy_server
+		_host_is_local.cache_clear()
+		shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+	@staticmethod
+	def _add(tar, name, content):
+		info = tarfile.TarInfo(name)
+		info.size = len(content)
+		tar.addfile(info, io.BytesIO(content))
+
+	def _test_make_upload_archive(self, expected_ext):
+		tar2upload = self.a2f._make_upload_archive(self.tmpdir)
+		self.assertTrue(tar2upload.endswith(expected_ext))
+		with tarfile.open(tar2upload, "r:*") as tar:
+			self.assertEqual(
+				sorted(tar.getnames()),
+				sorted([
+					"./short.c",
+					f"./{LONG_DIR}/x.c",
+					f"./{LONG_DIR}/link.c",
+					"./é.c",
+				])
+			)
+			self.assertEqual(tar.extractfile(f"./{LONG_DIR}/x.c").read(), b"long")
+			self.assertEqual(tar.extractfile("./é.c").read(), b"non-ascii")
+			link = tar.getmember(f"./{LONG_DIR}/link.c")
+			self.assertTrue(link.islnk())
+			self.assertEqual(link.linkname, f"./{LONG_DIR}/x.c")
+
+	def test_make_upload_archive_local(self):
+		Settings.FOSSY_SERVER = "http://fossology/repo"
+		with mock.patch("socket.getaddrinfo", _getaddrinfo(["172.18.0.2"])):
+			self._test_make_upload_archive(".tar")
+
+	def test_make_upload_archive_remote(self):
+		Settings.FOSSY_SERVER = "https://fossology.example.com/repo"
+		with mock.patch("socket.getaddrinfo", _getaddrinfo(["93.184.216.34"])):
+			self._test_make_upload_archive(".tar.xz")
+
+	def test_fossy_is_local(self):
+		Settings.FOSSY_SERVER = "http://fossology/repo"
+		inputs = [
+			[["127.0.0.1", "::1"], True],
+			[["192.168.1.10"], True],
+			[["fe80::1%eth0"], True],
+			[["10.0.0.1", "93.184.216.34"], False],
+			[["2001:4860:4860::8888"], False],
+			[[], False],
+		]
+		for ips, expect in inputs:
+			_host_is_local.cache_clear()
+			with mock.patch("socket.getaddrinfo", _getaddrinfo(ips)):
+				self.assertEqual(_fossy_is_local(), expect, ips)
+
+	def test_fossy_is_local_unresolved(self):
+		Settings.FOSSY_SERVER = "http://fossology/repo"
+		with mock.patch("socket.getaddrinfo", side_effect=socket.gaierror):
+			self.assertFalse(_fossy_is_local())
+
+	def test_fossy_is_local_resolved_once(self):
+		Settings.FOSSY_SERVER = "http://fossology/repo"
+		with mock.patch(
+			"socket.getaddrinfo", side_effect=_getaddrinfo(["172.18.0.2"])
+		) as getaddrinfo:
+			self.assertTrue(_fossy_is_local())
+			self.assertTrue(_fossy_is_local())
+		getaddrinfo.assert_called_once()
+
+	def test_strip_files_folder(self):
+		inputs = [
+			["files", "."],
+			["files/", "."],
+			["./files/a/b.c", "./a/b.c"],
+			["files/a.c", "./a.c"],
+			["aliensrc.json", None],
+			["filesx/a.c", None],
+		]
+		for name, expect in inputs:
+			self.assertEqual(UploadAliens2Fossy._strip_files_folder(name), expect)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from aliens4friends.commons.archive import Archive
+from aliens4friends.commons.package import AlienPackage
+
+class TestingAlienPackage(unittest.TestCase):
+
+	def setUp(self):
+		self.tmpdir = tempfile.mkdtemp(prefix="a4f-tests-")
+		self.cache_dir = os.path.join(self.tmpdir, "expand")
+		os.mkdir(self.cache_dir)
+		self.aliensrc = os.path.join(self.tmpdir, "foo-1.0-r0.aliensrc")
+		self._make_aliensrc()
+
+	def tearDown(self):
+		shutil.rmtree(self.tmpdir)
+
+	@staticmethod
+	def _add(tar, name, data):
+		info = tarfile.TarInfo(name)
+		info.size = len(data)
+		tar.addfile(info, io.BytesIO(data))
+
+	def _make_aliensrc(self):
+		internal = io.BytesIO()
+		with tarfile.open(fileobj=internal, mode="w:gz") as tar:
+			self._add(tar, "foo-1.0/foo.c", b"int foo;\n")
+		aliensrc = {
+			"version": 2,
+			"source_package": {
+				"name": "foo",
+				"version": "1.0-r0",
+				"manager": "bitbake",
+				"metadata": { "variant": None },
+				"files": [{
+					"name": "foo-1.0.tar.gz",
+					"sha1_cksum": "0" * 40,
+					"src_uri": "https://example.org/foo-1.0.tar.gz",
+					"files_in_archive": 1,
+					"paths": []
+				}]
+			}
+		}
+		with tarfile.open(self.aliensrc, mode="w") as tar:
+			self._add(tar, "aliensrc.json", json.dumps(aliensrc).encode())
+			self._add(tar, "files/foo-1.0.tar.gz", internal.getvalue())
+
+	def _expand(self):
+		apkg = AlienPackage(self.aliensrc)
+		apkg.expand(
+			get_internal_archive_rootfolders=True,
+			cache_dir=self.cache_dir
+		)
+		return apkg
+
+	def test_expand_cache(self):
+		apkg = self._expand()
+		self.assertEqual(apkg.internal_archive_name, "foo-1.0.tar.gz")
+		self.assertEqual(apkg.internal_archive_rootfolder, "foo-1.0")
+		self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+		# unchanged aliensrc: results are taken from the cache
+		with mock.patch.object(Archive, "in_archive_rootfolder") as rootfolder:
+			apkg = self._expand()
+			rootfolder.assert_not_called()
+		self.assertEqual(apkg.internal_archive_name, "foo-1.0.tar.gz")
+		self.assertEqual(apkg.internal_archive_rootfolder, "foo-1.0")
+
+		# changed aliensrc: the stale cache file is replaced
+		st = os.stat(self.aliensrc)
+		os.utime(self.aliensrc, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+		with mock.patch.object(
+			Archive, "in_archive_rootfolder", return_value="bar-1.0"
+		) as rootfolder:
+			apkg = self._expand()
+			rootfolder.assert_called_once()
+		self.assertEqual(apkg.internal_archive_rootfolder, "bar-1.0")
+		self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+		apkg = self._expand()
+		self.assertEqual(apkg.internal_archive_rootfolder, "bar-1.0")
+
+if __name__ == '__main__':
+	unittest.main()
@@ -4,24 +4,24 @@
 
 import unittest
 import shutil
+import tempfile
 import os
 
 from aliens4friends.commons.settings import Settings
 from aliens4friends.commons.pool import Pool, PoolError
 
-TEST_PATH = "/tmp/a4f/tests"
-
 class TestingPool(unittest.TestCase):
 
 	def setUp(self):
-		self.shared_pool = Pool(f"{TEST_PATH}/pool")
+		self.tmpdir = tempfile.mkdtemp(prefix="a4f-tests-")
+		self.shared_pool = Pool(f"{self.tmpdir}/pool")
 		Settings.DOTENV["A4F_CACHE"] = Settings.POOLCACHED = False
-		self.shared_tmpfile = f"{TEST_PATH}/tmpfile.txt"
+		self.shared_tmpfile = f"{self.tmpdir}/tmpfile.txt"
 		with open(self.shared_tmpfile, "w") as f:
 			f.write("Hello World!")
 
 	def tearDown(self):
-		shutil.rmtree(TEST_PATH)
+		shutil.rmtree(self.tmpdir, ignore_errors=True)
 
 	def _test_add_write(self, content):
 		self.assertTrue(
@@ -78,6 +78,31 @@ class TestingPool(unittest.TestCase):
 		)
 		self._test_add_write([1,2,3])
 
+	def test_write_json_large(self):
+		# big enough to be read through mmap
+		content = list(range(100000))
+		self.shared_pool.write_json(
+			content,
+			"test_add",
+			"a_folder",
+			"tmpfile.txt"
+		)
+		self._test_add_write(content)
+
+	def test_write_json_surrogates(self):
+		# non utf-8 file names, as returned by os APIs
+		name = b"caf\xe9.c".decode("utf-8", "surrogateescape")
+		for content in [
+			{"files": [name]},
+			{"files": [name] * 10000}, # big enough to be read through mmap
+		]:
+			self.shared_pool.write_json(
+				content,
+				"test_add",
+				"a_folder",
+				"tmpfile.txt"
+			)
+			self._test_add_write(content)
 
 	def test_add_with_history(self):
 		self.shared_pool.add_with_history(
@@ -113,11 +138,41 @@ class TestingPool(unittest.TestCase):
 		self.assertEqual(result, "test/abc.txt")
 
 		try:
-			result = self.shared_pool.clnpath(f"{TEST_PATH}/test/abc.txt")
+			result = self.shared_pool.clnpath(f"{self.tmpdir}/test/abc.txt")
 			self.fail("Exception missing: only paths inside the pool root directory allowed as parameter")
 		except PoolError:
 			pass
 
+	def test_absglob(self):
+		for folders in [
+			("userland", "tar", "1.32-r0"),
+			("userland", "tar", "1.32-r0", "history"),
+			("userland", "zlib", "1.2.11-r0"),
+			("debian", "zlib", "1.2.11-2"),
+		]:
+			self.shared_pool.add(self.shared_tmpfile, *folders)
+			self.shared_pool.write(b"", *folders, "pkg.aliensrc")
+
+		expect = sorted([
+			self.shared_pool.abspath("userland/tar/1.32-r0/pkg.aliensrc"),
+			self.shared_pool.abspath("userland/tar/1.32-r0/history/pkg.aliensrc"),
+			self.shared_pool.abspath("userland/zlib/1.2.11-r0/pkg.aliensrc"),
+			self.shared_pool.abspath("debian/zlib/1.2.11-2/pkg.aliensrc"),
+		])
+		result = sorted(str(p) for p in self.shared_pool.absglob("*/*/*.aliensrc"))
+		self.assertEqual(result, expect)
+
+		result = sorted(
+			str(p) for p in self.shared_pool.absglob("zlib/*/*.aliensrc", "userland")
+		)
+		self.assertEqual(
+			result,
+			[self.shared_pool.abspath("userland/zlib/1.2.11-r0/pkg.aliensrc")]
+		)
+
+		result = list(self.shared_pool.absglob("tmpfile.txt", "debian"))
+		self.assertEqual(len(result), 1)
+
 	def test_package_info_from_path(self):
 		inputs = [
 			"userland/tar/1.32-r0/tar-1.32.tar.bz2-gid3.alien.spdx",
@@ -0,0 +1,52 @@
+# SPDX-FileCopyrightText: NOI Techpark <info@noi.bz.it>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from spdx.checksum import Algorithm
+from spdx.file import File as SPDXFile
+from spdx.package import Package as SPDXPackage
+
+from aliens4friends.commons.spdxutils import calc_verif_code, get_files_sha1
+
+class TestingSpdxUtils(unittest.TestCase):
+
+	def setUp(self):
+		self.tmpdir = tempfile.mkdtemp(prefix="a4f-tests-")
+
+	def tearDown(self):
+		shutil.rmtree(self.tmpdir)
+
+	def _make_files(self):
+		files = []
+		for i in range(10):
+			path = os.path.join(self.tmpdir, f"file{i}.c")
+			with open(path, "w") as f:
+				f.write(f"int x{i};\n")
+			spdx_file = SPDXFile(path)
+			# files without a SHA1 checksum in SPDX data get it calculated
+			# from the actual file
+			if i % 3 == 1:
+				spdx_file.chk_sum = Algorithm("SHA1", f"{i:040x}")
+			elif i % 3 == 2:
+				spdx_file.chk_sum = Algorithm("MD5", f"{i:032x}")
+			files.append(spdx_file)
+		return files
+
+	def test_calc_verif_code(self):
+		files = self._make_files()
+		sha1s = get_files_sha1(files)
+		package = SPDXPackage()
+		for start, stop in [(None, None), (None, 5), (5, None), (3, 4), (0, 0)]:
+			package.files = files[start:stop]
+			self.assertEqual(
+				calc_verif_code(sha1s[start:stop]),
+				package.calc_verif_code()
+			)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,15 +1,52 @@
 #!/usr/bin/env python3
 
 import argparse
+import contextlib
+import functools
+import itertools
+import mmap
+import multiprocessing
 import os
+import pickle
+import re
+import selectors
+import shutil
+import signal
 import subprocess
 import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from typing import Tuple, Type
 
 import yaml
+try:
+	# libyaml C bindings (python3-yaml in Debian ships them) are much faster
+	from yaml import CSafeLoader as YamlLoader
+except ImportError:
+	from yaml import SafeLoader as YamlLoader
 
 PROGNAME = "yoctobuilder"
 
+# seconds the bitbake server stays alive after a build, waiting for the next
+# image build of the same build directory (it is stopped anyway when all
+# images have been built)
+BB_SERVER_TIMEOUT = 600
+
+# bash_live output buffering
+LIVE_BUFSIZE = 1 << 20
+LIVE_FLUSH_INTERVAL = 0.2 # seconds
+
+# success/failure marker files and build logs
+STATE_DIR = ".yoctobuild-state"
+LOG_DIR = f"{STATE_DIR}/logs"
+
+def _default_jobs() -> int:
+	# each bitbake run already uses BB_NUMBER_THREADS threads (which default to
+	# the number of cpus), so do not oversubscribe cpus by default
+	cpus = os.cpu_count() or 1
+	bb_threads = int(os.environ.get("BB_NUMBER_THREADS") or cpus)
+	return max(1, cpus // max(1, bb_threads))
+
 def main():
 	print("YOCTO BUILDER: started...", flush=True)
 
@@ -35,78 +72,99 @@ def main():
 		default = False,
 		help = "don't retry failed builds"
 	)
+	parser.add_argument(
+		"--jobs",
+		type = int,
+		default = _default_jobs(),
+		help = (
+			"number of build directories (flavour/machine combinations) to build"
+			" in parallel; images of the same build directory are always built"
+			" one after the other; with more than one job, bitbake output goes"
+			f" only to log files in {LOG_DIR} (default: cpu count / BB_NUMBER_THREADS)"
+		)
+	)
 	args = parser.parse_args()
 
-	with open(args.configyaml, 'r') as f:
-		yml = yaml.safe_load(f)
+	yml = _load_config(args.configyaml)
 
 	print("YOCTO BUILDER: Yaml parsed...", flush=True)
 
 	failed_flavours = []
+	_init_state_dir()
+	sentinels = _sentinels()
 	flavour_dir = yml['flavour_dir']
 	oe_init_build_env_dir = yml['oe_init_build_env_dir']
 
-	for flavour_id, flavour in yml['flavours'].items():
-
-		if os.path.isfile(f'.success-yoctobuild-{flavour_id}'):
-			print(f'{flavour_id} already exists... skipping')
-			continue
-
-		amount = len(flavour['machines']) * len(flavour['images'])
-		count = 0
-		failed = 0
-		templateconf = f"TEMPLATECONF=../{flavour_dir}/{flavour_id} "
-		print(f'YOCTO BUILDER: Processing flavour {flavour_id} (with {amount} machine/image combinations)', flush=True)
-		for machine_id in flavour['machines']:
+	# with a single job, build in this process, like it has always been done:
+	# a pool of worker processes would turn Ctrl-C into the failure of the
+	# current build only, and go on with the next ones
+	executor = None
+	submit = _call
+	if args.jobs > 1:
+		executor = ProcessPoolExecutor(max_workers=args.jobs)
+		submit = functools.partial(executor.submit, _run_in_worker)
+	futures = {}
+	try:
+		for flavour_id, flavour in yml['flavours'].items():
 
-			print(f'YOCTO BUILDER: [{flavour_id}] Processing machine {machine_id}')
-			if os.path.isfile(f'.success-yoctobuild-{flavour_id}-{machine_id}'):
-				print(f'{flavour_id}-{machine_id} already exists... skipping')
+			if _done(sentinels, flavour_id):
+				print(f'{flavour_id} already exists... skipping')
 				continue
 
-			bash(
-				f"{templateconf} . ./{oe_init_build_env_dir}/oe-init-build-env build-{flavour_id}-{machine_id}"
-			)
-			_conf_update(flavour_id, machine_id, yml.get('common_configs'), flavour.get('configs'))
+			amount = len(flavour['machines']) * len(flavour['images'])
+			print(f'YOCTO BUILDER: Processing flavour {flavour_id} (with {amount} machine/image combinations)', flush=True)
+			futures[flavour_id] = []
+			for machine_id in flavour['machines']:
 
-			for image_id in flavour['images']:
-				print(f'YOCTO BUILDER: [{flavour_id}][{machine_id}] Processing image {image_id}', flush=True)
-				if os.path.isfile(f'.success-yoctobuild-{flavour_id}-{machine_id}-{image_id}'):
-					print(f'{flavour_id}-{machine_id}-{image_id} already exists... skipping')
-					continue
-				if args.skip_failed_builds and os.path.isfile(f'.failure-yoctobuild-{flavour_id}-{machine_id}-{image_id}'):
-					print(f'{flavour_id}-{machine_id}-{image_id} already failed... skipping')
-					failed += 1
+				print(f'YOCTO BUILDER: [{flavour_id}] Processing machine {machine_id}')
+				name = f'{flavour_id}-{machine_id}'
+				if _done(sentinels, name):
+					print(f'{name} already exists... skipping')
 					continue
+
+				futures[flavour_id].append(submit(
+					_build_machine,
+					flavour_dir,
+					oe_init_build_env_dir,
+					flavour_id,
+					machine_id,
+					flavour['images'],
+					yml.get('common_configs'),
+					flavour.get('configs'),
+					args.skip_failed_builds,
+					sentinels,
+					# output of parallel builds would be interleaved
+					args.jobs <= 1
+				))
+
+		for flavour_id, machine_futures in futures.items():
+			failed = 0
+			for future in machine_futures:
 				try:
-					cmdstr=(
-						f'{templateconf} . ./{oe_init_build_env_dir}/oe-init-build-env build-{flavour_id}-{machine_id}; '
-						f'bitbake {image_id}'
-					)
-					print(f"\n{cmdstr}\n")
-					bash_live(cmdstr, logfile=f'.log-yoctobuild-{flavour_id}-{machine_id}-{image_id}')
-					count += 1
-					print(f'YOCTO BUILDER: {count}/{amount} done!')
-					bash(f'touch .success-yoctobuild-{flavour_id}-{machine_id}-{image_id}')
-					try:
-						bash(f'rm .failure-yoctobuild-{flavour_id}-{machine_id}-{image_id}')
-					except:
-						pass
-				except Exception:
-					bash(f'touch .failure-yoctobuild-{flavour_id}-{machine_id}-{image_id}')
+					failed += future.result()
+				except Exception as ex:
+					print(f'YOCTO BUILDER: [{flavour_id}] {ex}', flush=True)
 					failed += 1
 
 			if failed == 0:
-				bash(f'touch .success-yoctobuild-{flavour_id}-{machine_id}')
-
-		if failed == 0:
-			bash(f'touch .success-yoctobuild-{flavour_id}')
-		else:
-			failed_flavours.append(flavour_id)
+				_touch(_sentinel_path(flavour_id))
+			else:
+				failed_flavours.append(flavour_id)
+	except KeyboardInterrupt:
+		if executor:
+			# do not start queued builds, and stop the running ones
+			for machine_futures in futures.values():
+				for future in machine_futures:
+					future.cancel()
+			for worker in multiprocessing.active_children():
+				worker.terminate()
+		raise
+	finally:
+		if executor:
+			executor.shutdown()
 
 	print("YOCTO BUILDER: READY. Summary:")
-	out, _ = bash('ls .success-yoctobuild* .failure-yoctobuild* 2>/dev/null | sort')
-	print(out)
+	print("\n".join(sorted(_sentinels())))
 	if not failed_flavours:
 		sys.exit(0)
 	else:
@@ -117,13 +175,191 @@ def main():
 			sys.exit(1)
 
 
+def _call(fn, *args) -> Future:
+	"""Call fn right away, and return its result (or exception) as a Future,
+	as if it were submitted to an executor"""
+	future = Future()
+	try:
+		future.set_result(fn(*args))
+	except Exception as ex:
+		future.set_exception(ex)
+	return future
+
+
+def _run_in_worker(fn, *args):
+	"""Call fn in a worker process, where Ctrl-C must terminate the process
+	(bitbake gets it too, and stops), instead of raising KeyboardInterrupt:
+	the executor would take it as the result of the current task only, and go
+	on with the next queued ones"""
+	signal.signal(signal.SIGINT, signal.SIG_DFL)
+	return fn(*args)
+
+
+def _sentinels() -> set:
+	"""Get the names of all success/failure marker files, with a single
+	directory scan
+	"""
+	with os.scandir(STATE_DIR) as it:
+		return {
+			e.name for e in it
+			if e.name.startswith(('success-', 'failure-'))
+		}
+
+
+def _done(sentinels: set, name: str, status: str = 'success') -> bool:
+	"""Check if a build stage (flavour, flavour-machine or
+	flavour-machine-image) has a marker for status in sentinels
+	"""
+	return f'{status}-{name}' in sentinels
+
+
+def _sentinel_path(name: str, status: str = 'success') -> str:
+	"""Get the path of the marker file for status of a build stage"""
+	return f'{STATE_DIR}/{status}-{name}'
+
+
+def _init_state_dir() -> None:
+	"""Create the state directory, moving there marker files of previous
+	versions of this script, which were kept in the current directory
+	"""
+	os.makedirs(LOG_DIR, exist_ok=True)
+	with os.scandir('.') as it:
+		for e in it:
+			for status in ('success', 'failure'):
+				prefix = f'.{status}-yoctobuild-'
+				if e.name.startswith(prefix):
+					os.replace(e.name, _sentinel_path(e.name[len(prefix):], status))
+
+
+def _load_config(path: str) -> dict:
+	"""Load the configuration yaml file, reusing the parsed configuration of a
+	previous run, if the file did not change in the meantime
+	"""
+	st = os.stat(path)
+	key = f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+	cache_dir = os.path.join(
+		os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+		PROGNAME
+	)
+	# a single cache file, holding the key and the parsed configuration: it is
+	# overwritten whenever the configuration (or its path) changes
+	cache_file = os.path.join(cache_dir, "config.pkl")
+	try:
+		with open(cache_file, 'rb') as f:
+			cached_key, yml = pickle.load(f)
+		if cached_key == key:
+			return yml
+	except Exception:
+		pass
+
+	with open(path, 'r') as f:
+		yml = yaml.load(f, Loader=YamlLoader)
+
+	try:
+		os.makedirs(cache_dir, exist_ok=True)
+		tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+		with open(tmp_file, 'wb') as f:
+			pickle.dump((key, yml), f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_file, cache_file)
+	except OSError:
+		pass # caching is just an optimization
+	return yml
+
+
+def _build_machine(
+	flavour_dir: str,
+	oe_init_build_env_dir: str,
+	flavour_id: str,
+	machine_id: str,
+	images: list,
+	common_configs: list = None,
+	configs: dict = None,
+	skip_failed_builds: bool = False,
+	sentinels: set = frozenset(),
+	echo: bool = True
+) -> int:
+	"""Build all images of a flavour for a machine, in its own build directory
+	:param echo: if False, bitbake output goes only to log files
+	:return: number of failed image builds
+	"""
+	templateconf = f"TEMPLATECONF=../{flavour_dir}/{flavour_id} "
+	init_build_env = (
+		f"{templateconf} . ./{oe_init_build_env_dir}/oe-init-build-env build-{flavour_id}-{machine_id}"
+	)
+
+	bash(init_build_env)
+	_conf_update(flavour_id, machine_id, common_configs, configs)
+
+	try:
+		failed = _build_images(
+			init_build_env, flavour_id, machine_id, images, skip_failed_builds,
+			sentinels, echo
+		)
+	finally:
+		# stop the bitbake server kept alive between image builds
+		try:
+			bash(f"{init_build_env}; bitbake -m")
+		except Exception:
+			pass
+
+	if failed == 0:
+		_touch(_sentinel_path(f'{flavour_id}-{machine_id}'))
+	return failed
+
+
+def _build_images(
+	init_build_env: str,
+	flavour_id: str,
+	machine_id: str,
+	images: list,
+	skip_failed_builds: bool = False,
+	sentinels: set = frozenset(),
+	echo: bool = True
+) -> int:
+	"""Build images one after the other with the same bitbake server, so that
+	recipes are parsed only once
+	:param echo: if False, bitbake output goes only to log files
+	:return: number of failed image builds
+	"""
+	amount = len(images)
+	count = 0
+	failed = 0
+	for image_id in images:
+		print(f'YOCTO BUILDER: [{flavour_id}][{machine_id}] Processing image {image_id}', flush=True)
+		name = f'{flavour_id}-{machine_id}-{image_id}'
+		if _done(sentinels, name):
+			print(f'{name} already exists... skipping')
+			continue
+		if skip_failed_builds and _done(sentinels, name, 'failure'):
+			print(f'{name} already failed... skipping')
+			failed += 1
+			continue
+		logfile = f'{LOG_DIR}/{name}.log'
+		try:
+			cmdstr=(
+				f'{init_build_env}; '
+				f'bitbake --server-timeout {BB_SERVER_TIMEOUT} {image_id}'
+			)
+			print(f"\n{cmdstr}\n" if echo else f"{cmdstr} > {logfile}", flush=True)
+			bash_live(cmdstr, logfile=logfile, echo=echo)
+			count += 1
+			print(f'YOCTO BUILDER: [{flavour_id}][{machine_id}] {count}/{amount} done!')
+			_touch(_sentinel_path(name))
+			_rm(_sentinel_path(name, 'failure'))
+		except Exception:
+			print(f'YOCTO BUILDER: [{flavour_id}][{machine_id}] {image_id} failed! See {logfile}', flush=True)
+			_touch(_sentinel_path(name, 'failure'))
+			failed += 1
+	return failed
+
+
 def _conf_update(flavour, machine, common_configs = None, configs = None):
 	#FIXME We should copy the first local.conf to local.conf.orig and for each step
 	#      use that for substitution, and not re-substitute already changed files,
 	#      which could lead to unknown errors.
 	filepath = f'build-{flavour}-{machine}/conf/local.conf'
 	if not os.path.isfile(f'{filepath}.bak'):
-		bash(f'cp {filepath} {filepath}.bak')
+		shutil.copyfile(filepath, f'{filepath}.bak')
 
 	CONF_PARAMS = [
 		f'MACHINE ?= "{machine}"',
@@ -132,44 +368,103 @@ def _conf_update(flavour, machine, common_configs = None, configs = None):
 		'#SSTATE_MIRRORS',
 	]
 
-	conf_params = { c: False for c in CONF_PARAMS }
-
-	with open(filepath, "w") as fout:
-		orig_lines = []
-		vars_changed = []
-		with open(f"{filepath}.bak", "r") as fin:
-			for line in fin:
-				orig_lines.append(line)
-				for par in conf_params:
-					p = par.split()
-					var = " ".join(p[:2])
-					if par.startswith("#") and line.startswith(par[1:]):
-						conf_params[par] = True
-						line = f"#{line}" # comment out
-					elif (
-						len(p) > 2
-						and line.startswith(var)
-						or (line.startswith(f"#{var}") and var not in vars_changed)
-					):
-						conf_params[par] = True
-						vars_changed.append(var)
-						line = f"{par}\n"
-					elif len(p) < 3 and line.startswith(f"#{par}"):
-							conf_params[par] = True
-							line = line[1:] # uncomment
-
-				fout.write(line)
-		cfglist = common_configs.copy() if common_configs else []
-		if configs:
-			cfglist += configs.get('_all') or []
-			cfglist += configs.get(machine) or []
-			cfglist += [
-				par for par, found in conf_params.items()
-				if (not found) and len(par.split()) > 2 and (not par.startswith("#"))
-			]
-		for line in cfglist:
-			if line not in orig_lines:
-				fout.write(f'\n{line}\n')
+	# local.conf is handled as raw bytes, without decoding it
+	conf_params = { c.encode(): False for c in CONF_PARAMS }
+
+	# (param, number of words, variable with its operator, regex of the lines
+	# it may change) tuples, computed once for all lines
+	params = []
+	for par in conf_params:
+		p = par.split()
+		var = b" ".join(p[:2])
+		# lines not starting with any of these prefixes are never changed
+		prefixes = [ var, b"#" + var, b"#" + par ]
+		if par.startswith(b"#"):
+			prefixes.append(par[1:])
+		params.append((
+			par,
+			len(p),
+			var,
+			re.compile(
+				b"^(?:" + b"|".join(re.escape(x) for x in prefixes) + b")[^\n]*\n?",
+				flags=re.M
+			)
+		))
+
+	conf = b""
+	orig_lines = set()
+	with open(f"{filepath}.bak", "rb") as f:
+		if os.fstat(f.fileno()).st_size > 0: # empty files can't be mapped
+			with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+				orig_lines.update(iter(mm.readline, b""))
+				conf = mm
+				vars_changed = set()
+				for par, p_len, var, re_lines in params:
+					conf = re_lines.sub(
+						lambda m: _conf_update_line(
+							m.group(), par, p_len, var, conf_params, vars_changed
+						),
+						conf
+					)
+
+	# config lines to append, chained without copying them into a new list
+	cfglists = [ common_configs or () ]
+	if configs:
+		cfglists += [
+			configs.get('_all') or (),
+			configs.get(machine) or (),
+			(
+				par.decode() for par, p_len, _, _ in params
+				if (not conf_params[par]) and p_len > 2 and (not par.startswith(b"#"))
+			)
+		]
+	conf += b"".join(
+		b"\n" + line + b"\n"
+		for line in (c.encode() for c in itertools.chain.from_iterable(cfglists))
+		if line not in orig_lines
+	)
+	with open(filepath, "wb") as f:
+		f.write(conf)
+
+
+def _conf_update_line(
+	line: bytes,
+	par: bytes,
+	p_len: int,
+	var: bytes,
+	conf_params: dict,
+	vars_changed: set
+) -> bytes:
+	"""Apply a configuration parameter to a local.conf line
+	:return: the updated line
+	"""
+	if par.startswith(b"#") and line.startswith(par[1:]):
+		conf_params[par] = True
+		line = b"#" + line # comment out
+	elif (
+		p_len > 2
+		and line.startswith(var)
+		or (line.startswith(b"#" + var) and var not in vars_changed)
+	):
+		conf_params[par] = True
+		vars_changed.add(var)
+		line = par + b"\n"
+	elif p_len < 3 and line.startswith(b"#" + par):
+		conf_params[par] = True
+		line = line[1:] # uncomment
+	return line
+
+
+def _touch(path: str) -> None:
+	"""Create an empty file, or update its timestamps if it exists"""
+	with open(path, 'a'):
+		os.utime(path, None)
+
+
+def _rm(path: str) -> None:
+	"""Remove a file, if it exists"""
+	with contextlib.suppress(FileNotFoundError):
+		os.unlink(path)
 
 
 def bash(
@@ -206,29 +501,53 @@ def bash_live(
 	cwd: str = None,
 	exception: Type[Exception] = Exception,
 	prefix: str = "",
-	logfile = None
+	logfile = None,
+	echo: bool = True
 ) -> None:
 	"""Run a command in bash shell in live mode to fetch output when it is available
 	:param command: the command to run
 	:param cwd: directory where to run the command (defaults to current dir)
 	:param exception: Exception to raise when an error occurs
 	:param prefix: Prefix of output streams
+	:param echo: if False, output is not written to stdout, only to logfile
 	"""
-	log = open(logfile, "w") if logfile else None
+	log = open(logfile, "wb", buffering=LIVE_BUFSIZE) if logfile else None
+	# output is passed through as it is, in chunks, without decoding it and
+	# splitting it into lines; stdout and logfile are flushed at most every
+	# LIVE_FLUSH_INTERVAL seconds, or when the command is quiet
+	sys.stdout.flush()
+	outputs = [ f for f in (sys.stdout.buffer if echo else None, log) if f ]
 	with subprocess.Popen(
 		command, shell=True, executable="/bin/bash", cwd=cwd,
-		stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-		universal_newlines=True
-	) as proc:
+		stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+	) as proc, selectors.DefaultSelector() as sel:
+		fd = proc.stdout.fileno()
+		sel.register(fd, selectors.EVENT_READ)
+		pending = False
+		last_flush = time.monotonic()
 		while True:
-			output = proc.stdout.readline()
-			if output == '' and proc.poll() is not None:
+			if pending and not sel.select(timeout=LIVE_FLUSH_INTERVAL):
+				for output in outputs:
+					output.flush()
+				pending = False
+				last_flush = time.monotonic()
+				continue
+			chunk = os.read(fd, 65536)
+			if not chunk:
 				break
-			out = output.strip()
-			if out:
-				print(out, flush=True)
-				if log:
-					log.write(f"{out}\n")
+			if not outputs:
+				continue
+			for output in outputs:
+				output.write(chunk)
+			pending = True
+			now = time.monotonic()
+			if now - last_flush >= LIVE_FLUSH_INTERVAL:
+				for output in outputs:
+					output.flush()
+				pending = False
+				last_flush = now
+		for output in outputs:
+			output.flush()
 		rc = proc.wait()
 		if log:
 			log.close()
@@ -37,6 +37,7 @@ setuptools.setup(
         'flanker==0.9.11',
         'deepdiff==5.2.3',
         'beautifulsoup4==4.9.3',
+        'orjson==3.6.1',
     ],
     scripts=['bin/a4f', 'bin/aliens4friends'],
     license_files=['LICENSE',],